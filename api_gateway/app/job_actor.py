@@ -0,0 +1,107 @@
+import asyncio
+import logging
+
+from .job_store import JobStore
+
+logger = logging.getLogger(__name__)
+
+class JobActor:
+    """
+    The single owner of the JobStore.
+    Writes are queued as commands and applied, in order, by one coroutine (`run`),
+    so job records are only ever changed in one place. Reads wait for the writes
+    queued before them, so a reader always sees its own earlier writes.
+    """
+    def __init__(self, store: JobStore):
+        self.store = store
+        self._queue = None
+        self._task = None
+
+    def start(self):
+        # The queue is created here, inside the running event loop
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+    async def run(self):
+        while True:
+            command, job_id, fields, future = await self._queue.get()
+            # Nothing may end this loop: without it every write would be lost
+            # and every queued read would wait forever.
+            try:
+                try:
+                    result = self._apply(command, job_id, fields)
+                except Exception as e:
+                    if future is None:
+                        raise
+                    # The reader may have been cancelled (e.g. the client went away)
+                    if not future.done():
+                        future.set_exception(e)
+                else:
+                    if future is not None and not future.done():
+                        future.set_result(result)
+            except Exception:
+                logger.exception("Job command %r failed for job %s", command, job_id)
+
+    def _apply(self, command, job_id, fields):
+        store = self.store
+        if command == "create":
+            store[job_id] = fields
+        elif command == "update":
+            store.update(job_id, fields)
+        elif command == "get":
+            return self._snapshot(job_id)
+        elif command == "read_output":
+            store.mark_read(job_id)
+            return self._snapshot(job_id)
+        elif command == "sweep":
+            return store.sweep()
+        else:
+            raise ValueError(f"Unknown job command: {command}")
+
+    def _snapshot(self, job_id):
+        # Readers get a copy, never the live record
+        job = self.store.get(job_id)
+        return None if job is None else dict(job)
+
+    def _send(self, command, job_id=None, fields=None, reply=False):
+        future = asyncio.get_running_loop().create_future() if reply else None
+        self._queue.put_nowait((command, job_id, fields, future))
+        return future
+
+    # --- Creating a job: waits for the answer, since a full store refuses it ---
+
+    async def create(self, job_id, job: dict):
+        """Adds a new job. Raises JobStoreFull if the store has no room for it."""
+        if self._queue.empty():
+            return self._apply("create", job_id, job)
+        return await self._send("create", job_id, job, reply=True)
+
+    # --- Writes: queued, no need to wait for them ---
+
+    def update(self, job_id, **fields):
+        self._send("update", job_id, fields)
+
+    def sweep(self):
+        self._send("sweep")
+
+    # --- Reads ---
+
+    async def get(self, job_id):
+        """Returns a copy of the job, or None if it doesn't exist."""
+        if self._queue.empty():
+            # Fast path: no writes are pending, so the store is already up to date
+            return self._apply("get", job_id, None)
+        return await self._send("get", job_id, reply=True)
+
+    async def read_output(self, job_id):
+        """Like get(), but also marks the job's result as read."""
+        if self._queue.empty():
+            return self._apply("read_output", job_id, None)
+        return await self._send("read_output", job_id, reply=True)
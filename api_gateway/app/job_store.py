@@ -0,0 +1,100 @@
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+# Jobs in these states will never change again, so only they can be evicted.
+FINISHED_STATUSES = {"completed", "error"}
+
+class JobStoreFull(Exception):
+    """Raised when a new job doesn't fit because every job in the store is still in progress."""
+
+class JobStore:
+    """
+    A bounded, in-memory store for job records.
+    Holds at most `maxsize` jobs; finished jobs older than `ttl` seconds are dropped.
+    When the store is full, the least recently used finished job is evicted,
+    preferring jobs whose output has already been read. Jobs still in progress are
+    never evicted: if nothing else can go, new jobs are refused with JobStoreFull.
+    """
+    def __init__(self, maxsize=10000, ttl=3600):
+        self.maxsize = maxsize
+        self.ttl = timedelta(seconds=ttl)
+        self._jobs = {}
+        # Finished job ids, least recently used first, split by whether the output was read.
+        # Eviction pops from the front of one of these, so it never scans the store.
+        self._read = OrderedDict()
+        self._unread = OrderedDict()
+
+    def __contains__(self, job_id):
+        return job_id in self._jobs
+
+    def __len__(self):
+        return len(self._jobs)
+
+    def __getitem__(self, job_id):
+        job = self._jobs[job_id]
+        self._touch(job_id)
+        return job
+
+    def get(self, job_id, default=None):
+        if job_id not in self._jobs:
+            return default
+        return self[job_id]
+
+    def __setitem__(self, job_id, job):
+        if job_id not in self._jobs and len(self._jobs) >= self.maxsize:
+            self._evict()
+        self._jobs[job_id] = job
+        self._index(job_id, job)
+
+    def update(self, job_id, fields):
+        """Changes fields of a job, if it is still in the store."""
+        job = self._jobs.get(job_id)
+        if job is not None: # The job may have been evicted meanwhile
+            job.update(fields)
+            self._index(job_id, job)
+
+    def mark_read(self, job_id):
+        """Records that a finished job's output was read, so it is the first to go when the store is full."""
+        job = self._jobs.get(job_id)
+        if job is not None and "result" in job:
+            job["output_read"] = True
+            self._index(job_id, job)
+
+    def _index(self, job_id, job):
+        # Files the job under the eviction order that matches its current state
+        self._read.pop(job_id, None)
+        self._unread.pop(job_id, None)
+        if job["status"] in FINISHED_STATUSES:
+            index = self._read if job.get("output_read") else self._unread
+            index[job_id] = None
+
+    def _touch(self, job_id):
+        # A finished job that is used again moves to the back of its eviction order
+        for index in (self._read, self._unread):
+            if job_id in index:
+                index.move_to_end(job_id)
+                return
+
+    def _evict(self):
+        # Read results go first, then other finished jobs
+        for index in (self._read, self._unread):
+            if index:
+                victim, _ = index.popitem(last=False)
+                del self._jobs[victim]
+                return
+        raise JobStoreFull(f"All {self.maxsize} jobs in the store are still in progress")
+
+    def _is_expired(self, job, now):
+        return now - job["created_at"] > self.ttl
+
+    def sweep(self):
+        """Removes every finished job whose TTL has run out. Returns how many were removed."""
+        now = datetime.utcnow()
+        removed = 0
+        for index in (self._read, self._unread):
+            expired = [job_id for job_id in index if self._is_expired(self._jobs[job_id], now)]
+            for job_id in expired:
+                del index[job_id]
+                del self._jobs[job_id]
+            removed += len(expired)
+        return removed
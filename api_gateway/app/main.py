@@ -1,10 +1,14 @@
-from fastapi import FastAPI, HTTPException, BackgroundTasks
-from fastapi.staticfiles import StaticFiles
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Request, Response
 from fastapi.responses import FileResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from uuid import UUID, uuid4
+from contextlib import asynccontextmanager
+import asyncio
 import httpx
+import orjson
 from datetime import datetime
+import functools
 import os
 from .models import (
     JobSubmissionRequest,
@@ -12,8 +16,56 @@ from .models import (
     JobStatusResponse,
     JobOutputResponse,
 )
+from .job_store import JobStore, JobStoreFull
+from .job_actor import JobActor
 
-app = FastAPI()
+COMPILATION_SERVICE_URL = os.getenv("COMPILATION_SERVICE_URL")
+
+# --- Shared HTTP Client Settings ---
+# All timeouts for calls to the compilation service live here.
+# The long overall timeout leaves room for cold starts of the compilation service.
+HTTP_TIMEOUTS = {
+    "timeout": 45.0,
+    "connect": 10.0,
+}
+
+HTTP_LIMITS = httpx.Limits(
+    max_keepalive_connections=100,
+    max_connections=1000,
+    keepalive_expiry=15.0,
+)
+
+# --- Job Store Settings ---
+JOB_STORE_MAXSIZE = int(os.getenv("JOB_STORE_MAXSIZE", "10000"))
+JOB_TTL_SECONDS = int(os.getenv("JOB_TTL_SECONDS", "3600"))
+JOB_SWEEP_INTERVAL = 60
+
+async def sweep_expired_jobs():
+    # Periodically drops finished jobs that have outlived their TTL
+    while True:
+        await asyncio.sleep(JOB_SWEEP_INTERVAL)
+        jobs.sweep()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One client for the whole app, so connections to the compilation
+    # service are kept alive and reused instead of re-opened for every job.
+    # With HTTP/2 (negotiated over TLS, else HTTP/1.1) concurrent jobs share one connection.
+    app.state.http_client = httpx.AsyncClient(
+        http2=True,
+        timeout=httpx.Timeout(HTTP_TIMEOUTS["timeout"], connect=HTTP_TIMEOUTS["connect"]),
+        limits=HTTP_LIMITS,
+    )
+    jobs.start()
+    sweeper = asyncio.create_task(sweep_expired_jobs())
+    try:
+        yield
+    finally:
+        sweeper.cancel()
+        await jobs.stop()
+        await app.state.http_client.aclose()
+
+app = FastAPI(lifespan=lifespan)
 
 # --- CORS Middleware ---
 # Allows your frontend to talk to your backend
@@ -25,47 +77,90 @@ app.add_middleware(
     allow_headers=["*"],  # Allow all headers
 )
 
+# --- Compression Middleware ---
+# Compresses responses (frontend files, large job outputs) for clients that accept it
+app.add_middleware(GZipMiddleware, minimum_size=512)
+
 # --- Job Management ---
-jobs = {}
+# All job reads and writes go through the actor, which owns the store
+jobs = JobActor(JobStore(maxsize=JOB_STORE_MAXSIZE, ttl=JOB_TTL_SECONDS))
 
-COMPILATION_SERVICE_URL = os.getenv("COMPILATION_SERVICE_URL")
+# --- Concurrency Limit ---
+# Caps how many jobs are sent to the compilation service at once.
+# Extra jobs wait in the "queued" state instead of piling onto the sandbox host.
+MAX_CONCURRENT_COMPILES = int(os.getenv("MAX_CONCURRENT_COMPILES", "8"))
+COMPILE_QUEUE_TIMEOUT = float(os.getenv("COMPILE_QUEUE_TIMEOUT", "120"))
+_compile_sem = asyncio.Semaphore(MAX_CONCURRENT_COMPILES)
+
+async def acquire_compile_slot():
+    """
+    Waits up to COMPILE_QUEUE_TIMEOUT seconds for a free compile slot. Returns whether it got one.
+    asyncio.wait_for is not used: on Python 3.9 it can time out just as the slot is
+    granted, and that slot would then never be released.
+    """
+    acquire = asyncio.ensure_future(_compile_sem.acquire())
+    try:
+        await asyncio.wait({acquire}, timeout=COMPILE_QUEUE_TIMEOUT)
+    except BaseException:
+        # Cancelled while waiting: hand back a slot we got, or leave the queue
+        if acquire.done():
+            _compile_sem.release()
+        else:
+            acquire.cancel()
+        raise
+    if acquire.done():
+        return True
+    acquire.cancel() # Timed out: leave the queue. Nothing runs before this, so the slot wasn't granted.
+    return False
 
 async def run_compilation(job_id: UUID, source_code: str):
-    jobs[job_id]["status"] = "running"
+    jobs.update(job_id, status="queued")
+    if not await acquire_compile_slot():
+        jobs.update(job_id, status="error", result={
+            "stdout": "",
+            "stderr": f"The compiler is busy. The job waited {COMPILE_QUEUE_TIMEOUT:g} seconds in the queue. Please try again in a moment.",
+            "exit_code": -1,
+        })
+        return
+
     try:
-        # --- THE FIX: Increased timeout for cold starts ---
-        async with httpx.AsyncClient(timeout=45.0) as client:
-            if not COMPILATION_SERVICE_URL:
-                raise ValueError("COMPILATION_SERVICE_URL is not set.")
-            
-            # ✅ CORRECT: Define the URL variable first
-            full_url = f"{COMPILATION_SERVICE_URL}/compile"
-            
-            # ✅ CORRECT: Pass the variable directly to the post method
-            response = await client.post(
-                full_url, 
-                json={"source_code": source_code}
-            )
-            
-            response.raise_for_status()
-            result = response.json()
-            jobs[job_id]["result"] = result
-            jobs[job_id]["status"] = "completed"
+        jobs.update(job_id, status="running")
+        await send_to_compiler(job_id, source_code)
+    finally:
+        _compile_sem.release()
+
+async def send_to_compiler(job_id: UUID, source_code: str):
+    try:
+        if not COMPILATION_SERVICE_URL:
+            raise ValueError("COMPILATION_SERVICE_URL is not set.")
+
+        # ✅ CORRECT: Define the URL variable first
+        full_url = f"{COMPILATION_SERVICE_URL}/compile"
+
+        # Reuse the app-wide client (see lifespan) to keep connections warm
+        client = app.state.http_client
+        response = await client.post(
+            full_url,
+            content=orjson.dumps({"source_code": source_code}),
+            headers={"content-type": "application/json"}
+        )
+
+        response.raise_for_status()
+        result = orjson.loads(response.content)
+        jobs.update(job_id, status="completed", result=result)
 
     except httpx.RequestError as e:
-        jobs[job_id]["status"] = "error"
-        jobs[job_id]["result"] = {
+        jobs.update(job_id, status="error", result={
             "stdout": "",
             "stderr": f"Could not connect to the compilation service. It might be starting up. Please try again in a moment. Error: {e}",
             "exit_code": -1,
-        }
+        })
     except Exception as e:
-        jobs[job_id]["status"] = "error"
-        jobs[job_id]["result"] = {
+        jobs.update(job_id, status="error", result={
             "stdout": "",
             "stderr": f"An unexpected error occurred: {e}",
             "exit_code": -1,
-        }
+        })
 
 # --- API Endpoints ---
 @app.post("/jobs", response_model=JobSubmissionResponse, status_code=202)
@@ -73,21 +168,25 @@ async def submit_job(
     request: JobSubmissionRequest, background_tasks: BackgroundTasks
 ):
     job_id = uuid4()
-    jobs[job_id] = {"status": "pending", "created_at": datetime.utcnow()}
+    try:
+        await jobs.create(job_id, {"status": "pending", "created_at": datetime.utcnow()})
+    except JobStoreFull:
+        # Every stored job is still running; refuse rather than drop one of them
+        raise HTTPException(status_code=503, detail="Too many jobs are in progress. Please try again in a moment.")
     background_tasks.add_task(run_compilation, job_id, request.source_code)
     return {"job_id": job_id}
 
 @app.get("/jobs/{job_id}/status", response_model=JobStatusResponse)
 async def get_job_status(job_id: UUID):
-    if job_id not in jobs:
+    status_info = await jobs.get(job_id)
+    if status_info is None:
         raise HTTPException(status_code=404, detail="Job not found")
-    status_info = jobs[job_id].copy()
     status_info.pop("result", None)
     return {"job_id": job_id, **status_info}
 
 @app.get("/jobs/{job_id}/output", response_model=JobOutputResponse)
 async def get_job_output(job_id: UUID):
-    job = jobs.get(job_id)
+    job = await jobs.read_output(job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     if job.get("status") not in ["completed", "error"]:
@@ -98,20 +197,53 @@ async def get_job_output(job_id: UUID):
 
 # --- Frontend Serving ---
 # This must be the last part of the file
-app.mount("/static", StaticFiles(directory="frontend"), name="static")
+
+# Resolved once at import; the frontend directory never moves while the app runs
+FRONTEND_ROOT = os.path.realpath("frontend")
+INDEX_PATH = os.path.join(FRONTEND_ROOT, "index.html")
+
+# Files under /static/ may be cached for a long time; everything else
+# (like index.html) must be revalidated with the ETag on each visit.
+STATIC_CACHE_CONTROL = "public, max-age=31536000, immutable"
+PAGE_CACHE_CONTROL = "no-cache"
+
+@functools.lru_cache(maxsize=1024)
+def resolve_frontend_file(full_path: str):
+    """
+    Maps a request path to (file_path, etag).
+    Paths outside the frontend directory or without a matching file resolve to index.html.
+    The frontend files are baked into the image, so the result can be cached for the process lifetime.
+    """
+    # Check if the path is trying to access a file in the frontend directory
+    # This prevents directory traversal attacks
+    candidate = os.path.realpath(os.path.join(FRONTEND_ROOT, full_path))
+    if not candidate.startswith(FRONTEND_ROOT + os.sep) or not os.path.isfile(candidate):
+        candidate = INDEX_PATH
+
+    # A weak ETag built from the file's modification time and size
+    st = os.stat(candidate)
+    etag = f'W/"{st.st_mtime_ns:x}-{st.st_size:x}"'
+    return candidate, etag
+
+def cached_file_response(request: Request, file_path: str, etag: str, cache_control: str):
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return FileResponse(file_path, headers=headers)
 
 @app.get("/{full_path:path}")
-async def serve_frontend(full_path: str):
+async def serve_frontend(full_path: str, request: Request):
     # This serves your index.html for any path that is not an API endpoint
     # This is useful for single-page applications with routing
-    # Check if the path is trying to access a file in the frontend directory
-    # This prevents directory traversal attacks
-    file_path = os.path.join("frontend", full_path)
-    if os.path.commonprefix((os.path.realpath(file_path), os.path.realpath("frontend"))) != os.path.realpath("frontend"):
-        return FileResponse(os.path.join("frontend", "index.html"))
 
-    if os.path.isfile(file_path):
-        return FileResponse(file_path)
+    # /static/<file> is an alias for frontend/<file>
+    is_static = full_path.startswith("static/")
+    if is_static:
+        full_path = full_path[len("static/"):]
 
-    # For any other path, serve index.html
-    return FileResponse(os.path.join("frontend", "index.html"))
\ No newline at end of file
+    file_path, etag = resolve_frontend_file(full_path)
+    if is_static and file_path != INDEX_PATH:
+        cache_control = STATIC_CACHE_CONTROL
+    else:
+        cache_control = PAGE_CACHE_CONTROL
+    return cached_file_response(request, file_path, etag, cache_control)
@@ -14,7 +14,7 @@ class JobSubmissionResponse(BaseModel):
 # Model for checking the status of a job
 class JobStatusResponse(BaseModel):
     job_id: UUID
-    status: Literal['pending', 'running', 'completed', 'error']
+    status: Literal['pending', 'queued', 'running', 'completed', 'error']
     created_at: datetime
 
 # Model for the final output of a completed job
@@ -1,8 +1,10 @@
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from .sandbox import run_in_sandbox
 
-app = FastAPI()
+# orjson serializes the (possibly large) stdout/stderr much faster than the stdlib json
+app = FastAPI(default_response_class=ORJSONResponse)
 
 class CompilationRequest(BaseModel):
     source_code: str
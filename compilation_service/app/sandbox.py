@@ -1,43 +1,50 @@
 import asyncio
-import tempfile
-import shutil
 import os
+import signal
 import traceback
 
+# Resource limits for each compiler process
+TIMEOUT_SECONDS = 10.0
+MEMORY_LIMIT_BYTES = 256 << 20
+CPU_LIMIT_SECONDS = 10
+
+# The compiler applies these limits to itself when it starts (see compiler/main.py)
+COMPILER_ENV = {
+    **os.environ,
+    "WBM_MEMORY_LIMIT": str(MEMORY_LIMIT_BYTES),
+    "WBM_CPU_LIMIT": str(CPU_LIMIT_SECONDS),
+}
+
 async def run_in_sandbox(source_code: str):
     """
     Runs the given source code in a secure subprocess within the container.
     The container itself acts as the sandbox.
     """
-    # Create a temporary directory to store the code file
-    temp_dir = tempfile.mkdtemp()
-    
     try:
-        # Define the path for the source code file
-        source_file_path = os.path.join(temp_dir, "test.lang")
-        
-        # Write the user's source code to the file
-        with open(source_file_path, "w") as f:
-            f.write(source_code)
-
-        # The command to execute: run your compiler's main.py on the new file
+        # The command to execute: run your compiler's main.py, reading the code from stdin.
         # We specify the full path to the python interpreter and the script
         command = [
             "python", 
             "compiler/main.py", 
-            source_file_path
+            "-"
         ]
 
-        # Create the subprocess
+        # Create the subprocess in its own session (and process group),
+        # so a timeout can kill it together with anything it spawned
         proc = await asyncio.create_subprocess_exec(
             *command,
+            stdin=asyncio.subprocess.PIPE,
             stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
+            stderr=asyncio.subprocess.PIPE,
+            start_new_session=True,
+            env=COMPILER_ENV
         )
 
-        # Wait for the process to finish, with a 10-second timeout
+        # Send the code and wait for the process to finish, with a 10-second timeout
         try:
-            stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=10.0)
+            stdout, stderr = await asyncio.wait_for(
+                proc.communicate(source_code.encode('utf-8')), timeout=TIMEOUT_SECONDS
+            )
             
             return {
                 "stdout": stdout.decode('utf-8', 'ignore'),
@@ -46,12 +53,15 @@ async def run_in_sandbox(source_code: str):
             }
 
         except asyncio.TimeoutError:
-            # If it times out, kill the process
-            proc.kill()
+            # If it times out, kill the whole process group
+            try:
+                os.killpg(proc.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass # The process already exited
             await proc.wait()
             return {
                 "stdout": "",
-                "stderr": "Execution timed out after 10 seconds.",
+                "stderr": f"Execution timed out after {TIMEOUT_SECONDS:g} seconds.",
                 "exit_code": -1
             }
 
@@ -62,6 +72,3 @@ async def run_in_sandbox(source_code: str):
             "stderr": f"An unexpected error occurred: {traceback.format_exc()}",
             "exit_code": -1
         }
-    finally:
-        # Clean up the temporary directory and file
-        shutil.rmtree(temp_dir)
@@ -9,21 +9,28 @@
 
 class ASTNode:
     """Base class for all AST nodes."""
-    pass
+    # Every node class lists its attributes in __slots__, so nodes carry no
+    # per-instance __dict__: they are smaller and faster to read.
+    __slots__ = ()
 
 # --- Program and Block Nodes ---
 
 class ProgramNode(ASTNode):
     """Represents the entire program: a list of statements."""
+    __slots__ = ('statements', 'scope_size')
     def __init__(self, statements):
         self.statements = statements
+        self.scope_size = 0 # Number of global slots, filled in by the resolver
     def __repr__(self):
         return f"ProgramNode({self.statements})"
 
 class BlockNode(ASTNode):
     """Represents a block of code enclosed in curly braces {}, like a function body."""
-    def __init__(self, statements):
+    __slots__ = ('statements', 'has_decls', 'scope_size')
+    def __init__(self, statements, has_decls=True):
         self.statements = statements
+        self.has_decls = has_decls # False if the block declares nothing, so it needs no scope of its own
+        self.scope_size = 0 # Number of slots in the block's scope, filled in by the resolver
     def __repr__(self):
         return f"BlockNode({self.statements})"
 
@@ -31,16 +38,20 @@ class BlockNode(ASTNode):
 
 class VarDeclNode(ASTNode):
     """Represents a variable declaration, e.g., int x = 10; """
+    __slots__ = ('var_type', 'is_array', 'var_name', 'value', 'lineno', 'slot')
     def __init__(self, var_type, var_name, value, lineno):
         self.var_type = var_type
+        self.is_array = isinstance(var_type, ArrayTypeNode) # Checked once here, read by the semantic analyzer
         self.var_name = var_name
         self.value = value
         self.lineno = lineno
+        self.slot = None # Filled in by the resolver
     def __repr__(self):
         return f"VarDeclNode(type={self.var_type}, name='{self.var_name}', value={self.value})"
 
 class AssignmentNode(ASTNode):
     """NEW: Represents an assignment to an existing variable, e.g., x = 20; or my_array[0] = 5; """
+    __slots__ = ('left', 'right', 'lineno')
     def __init__(self, left, right, lineno):
         self.left = left    # The variable or array element being assigned to
         self.right = right  # The value being assigned
@@ -50,6 +61,7 @@ class AssignmentNode(ASTNode):
 
 class PrintNode(ASTNode):
     """Represents a print statement, e.g., print(x); """
+    __slots__ = ('value', 'lineno')
     def __init__(self, value, lineno):
         self.value = value
         self.lineno = lineno
@@ -58,6 +70,7 @@ class PrintNode(ASTNode):
 
 class IfNode(ASTNode):
     """NEW: Represents an if-else statement."""
+    __slots__ = ('condition', 'then_block', 'else_block', 'lineno')
     def __init__(self, condition, then_block, else_block, lineno):
         self.condition = condition
         self.then_block = then_block
@@ -68,6 +81,7 @@ class IfNode(ASTNode):
 
 class WhileNode(ASTNode):
     """NEW: Represents a while loop."""
+    __slots__ = ('condition', 'body_block', 'lineno')
     def __init__(self, condition, body_block, lineno):
         self.condition = condition
         self.body_block = body_block
@@ -77,12 +91,15 @@ class WhileNode(ASTNode):
 
 class ForNode(ASTNode):
     """NEW: Represents a C-style for loop."""
-    def __init__(self, init, condition, update, body_block, lineno):
+    __slots__ = ('init', 'condition', 'update', 'body_block', 'lineno', 'has_decls', 'scope_size')
+    def __init__(self, init, condition, update, body_block, lineno, has_decls=True):
         self.init = init            # e.g., int i = 0
         self.condition = condition  # e.g., i < 10
         self.update = update        # e.g., i = i + 1
         self.body_block = body_block
         self.lineno = lineno
+        self.has_decls = has_decls # False if the initializer is a plain assignment
+        self.scope_size = 0 # Slots in the loop's own scope, filled in by the resolver
     def __repr__(self):
         return f"ForNode(init={self.init}, cond={self.condition}, update={self.update}, body={self.body_block})"
 
@@ -90,17 +107,24 @@ class ForNode(ASTNode):
 
 class FuncDefNode(ASTNode):
     """Represents a function definition."""
+    __slots__ = ('return_type', 'func_name', 'params', 'body', 'lineno', 'slot', 'param_slots', 'arity', 'frame_size')
     def __init__(self, return_type, func_name, params, body, lineno):
         self.return_type = return_type
         self.func_name = func_name
         self.params = params
         self.body = body
         self.lineno = lineno
+        # Filled in by the resolver
+        self.slot = None
+        self.param_slots = ()
+        self.arity = 0
+        self.frame_size = 0 # Slots for the parameters and the body's own declarations
     def __repr__(self):
         return f"FuncDefNode(name='{self.func_name}', params={self.params}, body={self.body})"
 
 class ReturnNode(ASTNode):
     """Represents a return statement."""
+    __slots__ = ('value', 'lineno')
     def __init__(self, value, lineno):
         self.value = value
         self.lineno = lineno
@@ -111,15 +135,18 @@ class ReturnNode(ASTNode):
 
 class BinOpNode(ASTNode):
     """Represents a binary operation, e.g., x + y or i < 10."""
-    def __init__(self, left, op, right):
+    __slots__ = ('left', 'op', 'right', 'op_fn')
+    def __init__(self, left, op, right, op_fn=None):
         self.left = left
         self.op = op
         self.right = right
+        self.op_fn = op_fn # The Python function that performs the operation, e.g. operator.add
     def __repr__(self):
         return f"BinOpNode(left={self.left}, op='{self.op.value}', right={self.right})"
 
 class UnaryOpNode(ASTNode):
     """NEW: Represents a unary operation, e.g., !is_active."""
+    __slots__ = ('op', 'expr')
     def __init__(self, op, expr):
         self.op = op
         self.expr = expr
@@ -128,10 +155,14 @@ class UnaryOpNode(ASTNode):
 
 class FuncCallNode(ASTNode):
     """Represents a function call, e.g., add(5, 10)."""
+    __slots__ = ('func_name', 'args', 'lineno', 'depth', 'slot')
     def __init__(self, func_name, args, lineno):
         self.func_name = func_name
         self.args = args
         self.lineno = lineno
+        # Where the function lives, filled in by the resolver
+        self.depth = None
+        self.slot = None
     def __repr__(self):
         return f"FuncCallNode(name='{self.func_name}', args={self.args})"
 
@@ -139,49 +170,58 @@ class FuncCallNode(ASTNode):
 
 class NumNode(ASTNode):
     """Represents an integer literal."""
+    __slots__ = ('value', 'lineno')
     def __init__(self, token):
-        self.value = token.value
+        self.value = int(token.value) # Converted once here, not on every evaluation
         self.lineno = token.lineno
     def __repr__(self):
         return f"NumNode({self.value})"
 
 class FloatNode(ASTNode):
     """Represents a float literal."""
+    __slots__ = ('value', 'lineno')
     def __init__(self, token):
-        self.value = token.value
+        self.value = float(token.value)
         self.lineno = token.lineno
     def __repr__(self):
         return f"FloatNode({self.value})"
 
 class StringNode(ASTNode):
     """NEW: Represents a string literal."""
+    __slots__ = ('value', 'lineno')
     def __init__(self, token):
-        self.value = token.value
+        self.value = token.value[1:-1] # Remove quotes
         self.lineno = token.lineno
     def __repr__(self):
-        return f"StringNode({self.value})"
+        return f"StringNode({self.value!r})"
 
 class CharNode(ASTNode):
     """Represents a character literal."""
+    __slots__ = ('value', 'lineno')
     def __init__(self, token):
-        self.value = token.value
+        self.value = token.value[1:-1] # Remove quotes
         self.lineno = token.lineno
     def __repr__(self):
-        return f"CharNode({self.value})"
+        return f"CharNode({self.value!r})"
 
 class BoolNode(ASTNode):
     """Represents a boolean literal (true or false)."""
+    __slots__ = ('value', 'lineno')
     def __init__(self, token):
-        self.value = token.value
+        self.value = token.value == 'true'
         self.lineno = token.lineno
     def __repr__(self):
         return f"BoolNode({self.value})"
 
 class VarNode(ASTNode):
     """Represents a variable being used/accessed."""
+    __slots__ = ('value', 'lineno', 'depth', 'slot')
     def __init__(self, token):
         self.value = token.value
         self.lineno = token.lineno
+        # Where the variable lives, filled in by the resolver
+        self.depth = None
+        self.slot = None
     def __repr__(self):
         return f"VarNode('{self.value}')"
 
@@ -189,6 +229,7 @@ class VarNode(ASTNode):
 
 class ArrayTypeNode(ASTNode):
     """NEW: Represents an array type, like int[] or float[]."""
+    __slots__ = ('base_type',)
     def __init__(self, base_type):
         self.base_type = base_type
     def __repr__(self):
@@ -196,6 +237,7 @@ class ArrayTypeNode(ASTNode):
 
 class ArrayLiteralNode(ASTNode):
     """NEW: Represents an array literal, e.g., {1, 2, 3}."""
+    __slots__ = ('elements', 'lineno')
     def __init__(self, elements, lineno):
         self.elements = elements
         self.lineno = lineno
@@ -204,9 +246,33 @@ class ArrayLiteralNode(ASTNode):
 
 class ArrayAccessNode(ASTNode):
     """NEW: Represents accessing an array element, e.g., my_array[i]."""
+    __slots__ = ('name', 'index', 'lineno', 'depth', 'slot')
     def __init__(self, name, index, lineno):
         self.name = name
         self.index = index
         self.lineno = lineno
+        # Where the array variable lives, filled in by the resolver
+        self.depth = None
+        self.slot = None
     def __repr__(self):
-        return f"ArrayAccessNode(name='{self.name}', index={self.index})"
\ No newline at end of file
+        return f"ArrayAccessNode(name='{self.name}', index={self.index})"
+
+# --- Visitor Dispatch ---
+
+def node_classes(base=ASTNode):
+    """Yields every node class below `base`, including subclasses of subclasses."""
+    for node_class in base.__subclasses__():
+        yield node_class
+        yield from node_classes(node_class)
+
+def build_dispatch(visitor_class):
+    """
+    Maps each node class to the visitor's visit_<ClassName> method, so a visit is one
+    dict lookup instead of building the method name and calling getattr every time.
+    Call it once, after the visitor class is defined: visitor_class._DISPATCH = build_dispatch(visitor_class)
+    """
+    return {
+        node_class: getattr(visitor_class, f'visit_{node_class.__name__}')
+        for node_class in node_classes()
+        if hasattr(visitor_class, f'visit_{node_class.__name__}')
+    }
@@ -0,0 +1,376 @@
+# bytecode.py
+
+import sys
+
+from ast_nodes import *
+from token_kinds import *
+from interpreter import Environment, Unbound
+
+# ====================================================================================
+# This file defines a second way to run a program: a bytecode compiler and a small
+# virtual machine (VM). Instead of walking the tree, the BytecodeCompiler flattens
+# the resolved AST into a list of simple instructions, e.g. `x + 1` becomes:
+#   (LOAD_LOCAL, 0)  (BINARY_CONST, (operator.add, 1, lineno))
+# The VirtualMachine then runs the whole program in a single loop, keeping
+# intermediate values on a stack. Function calls push a frame onto a list instead
+# of recursing in Python, so the whole program runs inside one Python function call.
+#
+# The VM uses the same scopes and slots as the tree-walking Interpreter, so the AST
+# must go through the Resolver first. It is selected with WBM_ENGINE=bytecode.
+# ====================================================================================
+
+# --- Opcodes ---
+# Each instruction is an (opcode, argument) pair.
+LOAD_CONST    = 0   # arg: value to push
+LOAD_LOCAL    = 1   # arg: slot in the current scope
+LOAD_VAR      = 2   # arg: (depth, slot)
+STORE_LOCAL   = 3   # arg: slot in the current scope
+STORE_VAR     = 4   # arg: (depth, slot)
+BINARY        = 5   # arg: (op_fn, lineno); pops right, then left
+BINARY_CONST  = 6   # arg: (op_fn, right value, lineno); pops left
+JUMP          = 7   # arg: target index
+JUMP_IF_FALSE = 8   # arg: target index; pops the condition
+LOAD_FUNC     = 9   # arg: (depth, slot, name)
+CALL          = 10  # arg: number of arguments
+RETURN        = 11  # return value is left on the stack
+LOAD_INDEX    = 12  # arg: lineno; pops index, then array
+STORE_INDEX   = 13  # arg: lineno; pops index, array, then value
+PUSH_SCOPE    = 14  # arg: number of slots
+POP_SCOPE     = 15
+UNARY_NOT     = 16
+UNARY_NEG     = 17
+PRINT         = 18
+POP           = 19
+BUILD_ARRAY   = 20  # arg: number of elements
+NAME_ERROR    = 21  # arg: message
+HALT          = 22
+
+class Function:
+    """A compiled function: its instructions and how to set up its scope."""
+    __slots__ = ('name', 'code', 'frame_size', 'param_slots', 'unbound')
+    def __init__(self, name, code, frame_size, param_slots, param_names):
+        self.name = name
+        self.code = code
+        self.frame_size = frame_size
+        self.param_slots = param_slots
+        # (slot, placeholder) for each parameter, used when a call passes too few arguments
+        self.unbound = tuple((slot, Unbound(param_name)) for slot, param_name in zip(param_slots, param_names))
+    def __repr__(self):
+        return f"Function({self.name})"
+
+class Program:
+    """A compiled program: the top-level instructions and the size of the global scope."""
+    def __init__(self, code, scope_size):
+        self.code = code
+        self.scope_size = scope_size
+
+class BytecodeCompiler:
+    """Turns a resolved AST into a Program."""
+    LITERALS = (NumNode, FloatNode, StringNode, CharNode, BoolNode)
+    STATEMENTS = (VarDeclNode, AssignmentNode, PrintNode, IfNode, WhileNode, ForNode,
+                  FuncDefNode, ReturnNode, BlockNode)
+
+    def __init__(self):
+        self.code = None
+
+    def compile(self, ast):
+        self.code = []
+        self.visit(ast)
+        self.emit(HALT)
+        return Program(self.code, ast.scope_size)
+
+    def visit(self, node):
+        return self._DISPATCH.get(type(node), BytecodeCompiler.generic_visit)(self, node)
+
+    def generic_visit(self, node):
+        raise NotImplementedError(f"No visit_{type(node).__name__} method")
+
+    # --- Helper Methods ---
+
+    def emit(self, op, arg=None):
+        """Appends an instruction and returns its index."""
+        self.code.append((op, arg))
+        return len(self.code) - 1
+
+    def patch(self, index, target):
+        """Points the jump at `index` to `target`."""
+        self.code[index] = (self.code[index][0], target)
+
+    def load(self, depth, slot, name):
+        if slot is None:
+            self.emit(NAME_ERROR, f"Variable '{name}' not found.")
+        elif depth == 0:
+            self.emit(LOAD_LOCAL, slot)
+        else:
+            self.emit(LOAD_VAR, (depth, slot))
+
+    def statement(self, node):
+        self.visit(node)
+        if not isinstance(node, self.STATEMENTS):
+            self.emit(POP) # An expression used as a statement, like `f();`
+
+    # --- Statements ---
+
+    def visit_ProgramNode(self, node):
+        for statement in node.statements:
+            self.statement(statement)
+
+    def visit_BlockNode(self, node):
+        if node.has_decls:
+            self.emit(PUSH_SCOPE, node.scope_size)
+        for statement in node.statements:
+            self.statement(statement)
+        if node.has_decls:
+            self.emit(POP_SCOPE)
+
+    def visit_VarDeclNode(self, node):
+        self.visit(node.value)
+        self.emit(STORE_LOCAL, node.slot)
+
+    def visit_AssignmentNode(self, node):
+        self.visit(node.right)
+        target = node.left
+        if isinstance(target, VarNode):
+            if target.slot is None:
+                self.emit(NAME_ERROR, f"Cannot assign to undefined variable '{target.value}'.")
+            elif target.depth == 0:
+                self.emit(STORE_LOCAL, target.slot)
+            else:
+                self.emit(STORE_VAR, (target.depth, target.slot))
+        else: # ArrayAccessNode
+            self.load(target.depth, target.slot, target.name)
+            self.visit(target.index)
+            self.emit(STORE_INDEX, node.lineno)
+
+    def visit_PrintNode(self, node):
+        self.visit(node.value)
+        self.emit(PRINT)
+
+    def visit_IfNode(self, node):
+        self.visit(node.condition)
+        jump_to_else = self.emit(JUMP_IF_FALSE)
+        self.visit(node.then_block)
+        if node.else_block:
+            jump_to_end = self.emit(JUMP)
+            self.patch(jump_to_else, len(self.code))
+            self.visit(node.else_block)
+            self.patch(jump_to_end, len(self.code))
+        else:
+            self.patch(jump_to_else, len(self.code))
+
+    def visit_WhileNode(self, node):
+        loop_start = len(self.code)
+        self.visit(node.condition)
+        jump_to_end = self.emit(JUMP_IF_FALSE)
+        self.visit(node.body_block)
+        self.emit(JUMP, loop_start)
+        self.patch(jump_to_end, len(self.code))
+
+    def visit_ForNode(self, node):
+        if node.has_decls:
+            self.emit(PUSH_SCOPE, node.scope_size)
+        self.visit(node.init)
+        loop_start = len(self.code)
+        self.visit(node.condition)
+        jump_to_end = self.emit(JUMP_IF_FALSE)
+        self.visit(node.body_block)
+        self.visit(node.update)
+        self.emit(JUMP, loop_start)
+        self.patch(jump_to_end, len(self.code))
+        if node.has_decls:
+            self.emit(POP_SCOPE)
+
+    def visit_FuncDefNode(self, node):
+        # The body goes into its own instruction list
+        outer_code = self.code
+        self.code = []
+        self.visit(node.body)
+        self.emit(LOAD_CONST, None) # Falling off the end returns nothing
+        self.emit(RETURN)
+        function = Function(node.func_name, self.code, node.frame_size, node.param_slots,
+                            [param_name for _, param_name in node.params])
+        self.code = outer_code
+
+        self.emit(LOAD_CONST, function)
+        self.emit(STORE_LOCAL, node.slot)
+
+    def visit_ReturnNode(self, node):
+        self.visit(node.value)
+        self.emit(RETURN)
+
+    # --- Expressions ---
+
+    def visit_BinOpNode(self, node):
+        self.visit(node.left)
+        if isinstance(node.right, self.LITERALS):
+            # Common case like `i + 1` or `n < 2`: fold the constant into the instruction
+            self.emit(BINARY_CONST, (node.op_fn, node.right.value, node.op.lineno))
+        else:
+            self.visit(node.right)
+            self.emit(BINARY, (node.op_fn, node.op.lineno))
+
+    def visit_UnaryOpNode(self, node):
+        self.visit(node.expr)
+        self.emit(UNARY_NOT if node.op.type == TK_NOT else UNARY_NEG)
+
+    def visit_FuncCallNode(self, node):
+        # The function is looked up before its arguments are evaluated
+        if node.slot is None:
+            self.emit(NAME_ERROR, f"Function '{node.func_name}' not found.")
+        else:
+            self.emit(LOAD_FUNC, (node.depth, node.slot, node.func_name))
+        for arg in node.args:
+            self.visit(arg)
+        self.emit(CALL, len(node.args))
+
+    def visit_ArrayLiteralNode(self, node):
+        for element in node.elements:
+            self.visit(element)
+        self.emit(BUILD_ARRAY, len(node.elements))
+
+    def visit_ArrayAccessNode(self, node):
+        self.load(node.depth, node.slot, node.name)
+        self.visit(node.index)
+        self.emit(LOAD_INDEX, node.lineno)
+
+    def visit_VarNode(self, node):
+        self.load(node.depth, node.slot, node.value)
+
+    def visit_NumNode(self, node): self.emit(LOAD_CONST, node.value)
+    def visit_FloatNode(self, node): self.emit(LOAD_CONST, node.value)
+    def visit_StringNode(self, node): self.emit(LOAD_CONST, node.value)
+    def visit_CharNode(self, node): self.emit(LOAD_CONST, node.value)
+    def visit_BoolNode(self, node): self.emit(LOAD_CONST, node.value)
+
+BytecodeCompiler._DISPATCH = build_dispatch(BytecodeCompiler)
+
+class VirtualMachine:
+    """Runs a compiled Program."""
+    def __init__(self, max_call_depth=None):
+        # Calls don't use the Python stack, so the VM enforces its own limit
+        self.max_call_depth = max_call_depth or sys.getrecursionlimit()
+
+    def run(self, program):
+        code = program.code
+        global_env = env = Environment(program.scope_size)
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        frames = [] # (code, pc, env) of each caller
+        max_call_depth = self.max_call_depth
+        pc = 0
+
+        # The opcodes are tested roughly from most to least common
+        while True:
+            op, arg = code[pc]
+            pc += 1
+
+            if op == LOAD_LOCAL:
+                value = env.slots[arg]
+                if value.__class__ is Unbound:
+                    raise NameError(f"Variable '{value.name}' not found.")
+                push(value)
+            elif op == LOAD_CONST:
+                push(arg)
+            elif op == BINARY_CONST:
+                op_fn, right, lineno = arg
+                try:
+                    stack[-1] = op_fn(stack[-1], right)
+                except ZeroDivisionError:
+                    raise ZeroDivisionError(f"Division by zero at line {lineno}") from None
+            elif op == BINARY:
+                right = pop()
+                try:
+                    stack[-1] = arg[0](stack[-1], right)
+                except ZeroDivisionError:
+                    raise ZeroDivisionError(f"Division by zero at line {arg[1]}") from None
+            elif op == JUMP_IF_FALSE:
+                if not pop():
+                    pc = arg
+            elif op == STORE_LOCAL:
+                env.slots[arg] = pop()
+            elif op == JUMP:
+                pc = arg
+            elif op == LOAD_VAR:
+                depth, slot = arg
+                scope = env
+                for _ in range(depth):
+                    scope = scope.parent
+                value = scope.slots[slot]
+                if value.__class__ is Unbound:
+                    raise NameError(f"Variable '{value.name}' not found.")
+                push(value)
+            elif op == STORE_VAR:
+                depth, slot = arg
+                scope = env
+                for _ in range(depth):
+                    scope = scope.parent
+                scope.slots[slot] = pop()
+            elif op == LOAD_FUNC:
+                depth, slot, name = arg
+                scope = env
+                for _ in range(depth):
+                    scope = scope.parent
+                function = scope.slots[slot]
+                if function is None:
+                    raise NameError(f"Function '{name}' not found.")
+                push(function)
+            elif op == CALL:
+                if arg:
+                    args = stack[-arg:]
+                    del stack[-arg:]
+                else:
+                    args = ()
+                function = pop()
+                frame = [None] * function.frame_size
+                if arg < len(function.param_slots):
+                    # Missing arguments, filled first like the Interpreter does
+                    for slot, placeholder in function.unbound[arg:]:
+                        frame[slot] = placeholder
+                for slot, value in zip(function.param_slots, args): # Extra arguments are dropped
+                    frame[slot] = value
+                call_env = Environment(parent=global_env, slots=frame) # Functions see globals, not lexical scope
+                frames.append((code, pc, env))
+                if len(frames) > max_call_depth:
+                    raise RecursionError("maximum recursion depth exceeded")
+                code, pc, env = function.code, 0, call_env
+            elif op == RETURN:
+                code, pc, env = frames.pop()
+            elif op == LOAD_INDEX:
+                index = pop()
+                array = stack[-1]
+                if not 0 <= index < len(array):
+                    raise IndexError(f"Array index out of bounds at line {arg}")
+                stack[-1] = array[index]
+            elif op == STORE_INDEX:
+                index = pop()
+                array = pop()
+                value = pop()
+                if not 0 <= index < len(array):
+                    raise IndexError(f"Array index out of bounds at line {arg}")
+                array[index] = value
+            elif op == PUSH_SCOPE:
+                env = Environment(arg, parent=env)
+            elif op == POP_SCOPE:
+                env = env.parent
+            elif op == UNARY_NOT:
+                stack[-1] = not stack[-1]
+            elif op == UNARY_NEG:
+                stack[-1] = -stack[-1]
+            elif op == PRINT:
+                print(pop())
+            elif op == POP:
+                pop()
+            elif op == BUILD_ARRAY:
+                if arg:
+                    array = stack[-arg:]
+                    del stack[-arg:]
+                else:
+                    array = []
+                push(array)
+            elif op == NAME_ERROR:
+                raise NameError(arg)
+            elif op == HALT:
+                return
+            else:
+                raise RuntimeError(f"Unknown opcode {op} at {pc - 1}")
@@ -1,74 +1,63 @@
 # interpreter.py
 
 from ast_nodes import *
+from token_kinds import *
 
 # ====================================================================================
 # This file defines the Interpreter. Its job is to "walk" the validated AST and
 # execute the code. It keeps track of the program's state (like the values of
-# variables) in an "Environment". For each node in the tree, it performs an action:
+# variables) in an "Environment". Every variable has a fixed slot in its scope,
+# assigned ahead of time by the Resolver. For each node in the tree, it performs an action:
 # - For a BinOpNode, it does the math.
 # - For a VarDeclNode, it stores the variable in the environment.
 # - For an IfNode, it makes a decision and executes the correct block.
 # - For a WhileNode, it repeats a block of code.
 # ====================================================================================
 
-class ReturnValue(Exception):
-    """An exception used to jump out of function calls with a return value."""
-    def __init__(self, value):
-        self.value = value
-
 class Environment:
-    """Manages variable and function storage with scopes."""
-    def __init__(self, parent=None):
+    """Stores the values of one scope in a list, indexed by the slots the Resolver assigned."""
+    __slots__ = ('parent', 'slots')
+
+    def __init__(self, size=0, parent=None, slots=None):
         self.parent = parent
-        self.values = {}
-        self.functions = {}
-
-    def get(self, name):
-        if name in self.values:
-            return self.values[name]
-        if self.parent:
-            return self.parent.get(name)
-        raise NameError(f"Variable '{name}' not found.")
-
-    def set(self, name, value):
-        # We allow re-assignment to variables in the current or parent scopes
-        if name in self.values or self.parent is None:
-             self.values[name] = value
-        elif self.parent:
-             self.parent.set(name, value)
-        else:
-            raise NameError(f"Cannot assign to undefined variable '{name}'.")
+        self.slots = [None] * size if slots is None else slots
 
-    def declare(self, name, value):
-        # Used for new variable declarations (var decl)
-        self.values[name] = value
-        
-    def declare_function(self, name, node):
-        self.functions[name] = node
+    def ancestor(self, depth):
+        """Returns the scope `depth` levels up from this one."""
+        env = self
+        for _ in range(depth):
+            env = env.parent
+        return env
 
-    def get_function(self, name):
-        func = self.functions.get(name)
-        if func is None and self.parent:
-            return self.parent.get_function(name)
-        if func is None:
-            raise NameError(f"Function '{name}' not found.")
-        return func
+class Unbound:
+    """
+    Fills the slot of a parameter that a call passed no argument for. Reading the
+    parameter is then a NameError, until something is assigned to it.
+    """
+    __slots__ = ('name',)
+
+    def __init__(self, name):
+        self.name = name
 
 class Interpreter:
     """The interpreter, responsible for executing the AST."""
     def __init__(self):
-        self.environment = Environment()
+        self.environment = None # The global scope, created by interpret()
+        # A return statement sets these; every statement list checks _returning
+        # and stops early, until the function call picks up the value.
+        self._returning = False
+        self._return_value = None
 
     def visit(self, node, env):
-        method_name = f'visit_{type(node).__name__}'
-        visitor = getattr(self, method_name, self.generic_visit)
-        return visitor(node, env)
+        # _DISPATCH maps each node class to its visitor (built below the class)
+        return self._DISPATCH.get(type(node), Interpreter.generic_visit)(self, node, env)
 
     def generic_visit(self, node, env):
         raise NotImplementedError(f"No visit_{type(node).__name__} method")
 
     def interpret(self, ast):
+        """Runs a program. The AST must have been through the Resolver first."""
+        self.environment = Environment(ast.scope_size)
         return self.visit(ast, self.environment)
 
     # --- Visitor Methods ---
@@ -78,22 +67,26 @@ class Interpreter:
             self.visit(statement, env)
 
     def visit_BlockNode(self, node, env):
-        # Create a new scope for the block
-        block_env = Environment(parent=env)
+        # Create a new scope for the block, unless it declares nothing
+        block_env = Environment(node.scope_size, parent=env) if node.has_decls else env
         for statement in node.statements:
             self.visit(statement, block_env)
+            if self._returning:
+                return
     
     def visit_VarDeclNode(self, node, env):
-        value = self.visit(node.value, env)
-        env.declare(node.var_name, value)
+        env.slots[node.slot] = self.visit(node.value, env)
     
     def visit_AssignmentNode(self, node, env):
         value = self.visit(node.right, env)
         
         if isinstance(node.left, VarNode):
-            env.set(node.left.value, value)
+            target = node.left
+            if target.slot is None:
+                raise NameError(f"Cannot assign to undefined variable '{target.value}'.")
+            env.ancestor(target.depth).slots[target.slot] = value
         elif isinstance(node.left, ArrayAccessNode):
-            array = env.get(node.left.name)
+            array = self.lookup_array(node.left, env)
             index = self.visit(node.left.index, env)
             if not 0 <= index < len(array):
                 raise IndexError(f"Array index out of bounds at line {node.lineno}")
@@ -109,15 +102,27 @@ class Interpreter:
             self.visit(node.else_block, env)
             
     def visit_WhileNode(self, node, env):
-        while self.visit(node.condition, env):
-            self.visit(node.body_block, env)
+        # Look up the visitors once, not on every iteration
+        condition, body = node.condition, node.body_block
+        visit_condition = self._DISPATCH.get(type(condition), Interpreter.generic_visit)
+        visit_body = self._DISPATCH.get(type(body), Interpreter.generic_visit)
+        while visit_condition(self, condition, env):
+            visit_body(self, body, env)
+            if self._returning:
+                return
 
     def visit_ForNode(self, node, env):
-        for_env = Environment(parent=env) # New scope for the loop variable
+        for_env = Environment(node.scope_size, parent=env) if node.has_decls else env # New scope for the loop variable
         self.visit(node.init, for_env)
-        while self.visit(node.condition, for_env):
-            self.visit(node.body_block, for_env)
-            self.visit(node.update, for_env)
+        condition, body, update = node.condition, node.body_block, node.update
+        visit_condition = self._DISPATCH.get(type(condition), Interpreter.generic_visit)
+        visit_body = self._DISPATCH.get(type(body), Interpreter.generic_visit)
+        visit_update = self._DISPATCH.get(type(update), Interpreter.generic_visit)
+        while visit_condition(self, condition, for_env):
+            visit_body(self, body, for_env)
+            if self._returning:
+                return
+            visit_update(self, update, for_env)
             
     def visit_PrintNode(self, node, env):
         value = self.visit(node.value, env)
@@ -125,68 +130,91 @@ class Interpreter:
         return value
 
     def visit_FuncDefNode(self, node, env):
-        env.declare_function(node.func_name, node)
+        env.slots[node.slot] = node
 
     def visit_FuncCallNode(self, node, env):
-        func_node = env.get_function(node.func_name)
-        args = [self.visit(arg, env) for arg in node.args]
-        call_environment = Environment(parent=self.environment) # Functions see globals, not lexical scope
-        
-        for (param_type, param_name), arg_value in zip(func_node.params, args):
-            call_environment.declare(param_name, arg_value)
+        func_node = None
+        if node.slot is not None:
+            func_node = env.ancestor(node.depth).slots[node.slot]
+        if func_node is None:
+            raise NameError(f"Function '{node.func_name}' not found.")
+        # Arguments are evaluated straight into the new frame
+        frame = [None] * func_node.frame_size
+        args = node.args
+        arity = func_node.arity
+        if len(args) < arity:
+            # Filled first, so a repeated parameter name keeps the argument it did get
+            for (_, param_name), slot in zip(func_node.params[len(args):], func_node.param_slots[len(args):]):
+                frame[slot] = Unbound(param_name)
+        for slot, arg in zip(func_node.param_slots, args):
+            frame[slot] = self.visit(arg, env)
+        if len(args) > arity: # Extra arguments are still evaluated, for their side effects
+            for arg in args[arity:]:
+                self.visit(arg, env)
+        call_environment = Environment(parent=self.environment, slots=frame) # Functions see globals, not lexical scope
         
-        try:
-            self.visit(func_node.body, call_environment)
-        except ReturnValue as ret:
-            return ret.value
+        self.visit(func_node.body, call_environment)
+        if self._returning:
+            value = self._return_value
+            self._returning = False
+            self._return_value = None
+            return value
         
         return None
 
     def visit_ReturnNode(self, node, env):
-        value = self.visit(node.value, env)
-        raise ReturnValue(value)
+        self._return_value = self.visit(node.value, env)
+        self._returning = True
 
     def visit_BinOpNode(self, node, env):
         left_val = self.visit(node.left, env)
         right_val = self.visit(node.right, env)
-        op_type = node.op.type
-
-        if op_type == 'PLUS': return left_val + right_val
-        if op_type == 'MINUS': return left_val - right_val
-        if op_type == 'MUL': return left_val * right_val
-        if op_type == 'DIV':
-            if right_val == 0:
-                raise ZeroDivisionError(f"Division by zero at line {node.left.lineno}")
-            return left_val / right_val
-        
-        # Boolean comparisons
-        if op_type == 'EQ': return left_val == right_val
-        if op_type == 'NEQ': return left_val != right_val
-        if op_type == 'LT': return left_val < right_val
-        if op_type == 'GT': return left_val > right_val
-        if op_type == 'LTE': return left_val <= right_val
-        if op_type == 'GTE': return left_val >= right_val
+        # op_fn was chosen by the parser, e.g. operator.add for '+'
+        try:
+            return node.op_fn(left_val, right_val)
+        except ZeroDivisionError:
+            raise ZeroDivisionError(f"Division by zero at line {node.op.lineno}") from None
 
     def visit_UnaryOpNode(self, node, env):
         expr_val = self.visit(node.expr, env)
-        if node.op.type == 'NOT':
+        if node.op.type == TK_NOT:
             return not expr_val
-        if node.op.type == 'MINUS':
+        if node.op.type == TK_MINUS:
             return -expr_val
 
-    def visit_NumNode(self, node, env): return int(node.value)
-    def visit_FloatNode(self, node, env): return float(node.value)
-    def visit_StringNode(self, node, env): return node.value[1:-1] # Remove quotes
-    def visit_CharNode(self, node, env): return node.value[1:-1] # Remove quotes
-    def visit_BoolNode(self, node, env): return True if node.value == 'true' else False
-    def visit_VarNode(self, node, env): return env.get(node.value)
+    # Literal nodes already hold their Python value, converted by the parser
+    def visit_NumNode(self, node, env): return node.value
+    def visit_FloatNode(self, node, env): return node.value
+    def visit_StringNode(self, node, env): return node.value
+    def visit_CharNode(self, node, env): return node.value
+    def visit_BoolNode(self, node, env): return node.value
+    def visit_VarNode(self, node, env):
+        if node.slot is None:
+            raise NameError(f"Variable '{node.value}' not found.")
+        for _ in range(node.depth):
+            env = env.parent
+        value = env.slots[node.slot]
+        if value.__class__ is Unbound:
+            raise NameError(f"Variable '{node.value}' not found.")
+        return value
+
+    def lookup_array(self, node, env):
+        """Returns the list that an ArrayAccessNode indexes into."""
+        if node.slot is None:
+            raise NameError(f"Variable '{node.name}' not found.")
+        array = env.ancestor(node.depth).slots[node.slot]
+        if array.__class__ is Unbound:
+            raise NameError(f"Variable '{node.name}' not found.")
+        return array
 
     def visit_ArrayLiteralNode(self, node, env):
         return [self.visit(elem, env) for elem in node.elements]
 
     def visit_ArrayAccessNode(self, node, env):
-        array = env.get(node.name)
+        array = self.lookup_array(node, env)
         index = self.visit(node.index, env)
         if not 0 <= index < len(array):
             raise IndexError(f"Array index out of bounds at line {node.lineno}")
-        return array[index]
\ No newline at end of file
+        return array[index]
+
+Interpreter._DISPATCH = build_dispatch(Interpreter)
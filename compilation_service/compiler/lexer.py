@@ -1,115 +1,309 @@
 # lexer.py
 
+import os
 import re
+import string
+import sys
 from collections import namedtuple
 
+from token_kinds import *
+
 # ====================================================================================
 # This file defines the Lexer. Its job is to take the raw source code string and
 # break it down into a stream of "tokens". Each token is a small piece of the
 # language, like a keyword, an operator, or a number.
 # ====================================================================================
 
-TokenType = namedtuple('TokenType', ['name', 'pattern'])
-Token = namedtuple('Token', ['type', 'value', 'lineno', 'column'])
+# `first_chars` lists the ASCII characters a token can start with.
+TokenType = namedtuple('TokenType', ['name', 'pattern', 'first_chars'])
+
+class Token:
+    """A single token. A plain slotted class, since one is made for every token in the source."""
+    __slots__ = ('type', 'value', 'lineno', 'column')
+    def __init__(self, type, value, lineno, column):
+        self.type = type
+        self.value = value
+        self.lineno = lineno
+        self.column = column
+    def __repr__(self):
+        return f"Token(type={TOKEN_NAMES[self.type]}, value={self.value!r}, lineno={self.lineno}, column={self.column})"
+
+DIGITS = string.digits
+LETTERS = string.ascii_letters + '_'
+IDENT_CHARS = frozenset(LETTERS + DIGITS)
+
+# WBM_REGEX_LEXER=1 switches back to the regex-based lexer, to cross-check the hand-written one.
+USE_REGEX_LEXER = os.environ.get('WBM_REGEX_LEXER') == '1'
 
 TOKEN_SPECS = [
     # -- Structural Tokens --
-    TokenType('COMMENT',   r'//.*'),
-    TokenType('WHITESPACE',r'\s+'),
-
-    # -- Keywords for New Features --
-    TokenType('IF',        r'\bif\b'),
-    TokenType('ELSE',      r'\belse\b'),
-    TokenType('WHILE',     r'\bwhile\b'),
-    TokenType('FOR',       r'\bfor\b'),
-    TokenType('STRING',    r'\bstring\b'),
+    # Skipped by tokenize() before it looks at the dispatch table, so they have no first_chars.
+    TokenType('COMMENT',   r'//.*', ''),
+    TokenType('WHITESPACE',r'\s+', ''),
 
-    # -- Existing Keywords --
-    TokenType('BOOL',      r'\bbool\b'),
-    TokenType('CHAR',      r'\bchar\b'),
-    TokenType('FLOAT',     r'\bfloat\b'),
-    TokenType('INT',       r'\bint\b'),
-    TokenType('DEF',       r'\bdef\b'),
-    TokenType('RETURN',    r'\breturn\b'),
-    TokenType('PRINT',     r'\bprint\b'),
-    
     # -- Literals (Order is important!) --
-    TokenType('STRING_LIT',r'"[^"]*"'),  # Match text in double quotes
-    TokenType('FLOAT_LIT', r'\d+\.\d+'),    # Must come before NUMBER
-    TokenType('BOOL_LIT',  r'\b(true|false)\b'),
-    TokenType('CHAR_LIT',  r'\'[^\']\''), # Match a single character in single quotes
-    TokenType('NUMBER',    r'\d+'),
-
-    # -- Identifiers --
-    TokenType('ID',        r'[a-zA-Z_][a-zA-Z0-9_]*'),
+    TokenType('STRING_LIT',r'"[^"]*"', '"'),  # Match text in double quotes
+    TokenType('FLOAT_LIT', r'\d+\.\d+', DIGITS),    # Must come before NUMBER
+    TokenType('CHAR_LIT',  r'\'[^\']\'', "'"), # Match a single character in single quotes
+    TokenType('NUMBER',    r'\d+', DIGITS),
+
+    # -- Identifiers (and keywords, see KEYWORDS) --
+    TokenType('ID',        r'[a-zA-Z_][a-zA-Z0-9_]*', LETTERS),
     
     # -- Operators and Delimiters --
     # Comparison operators
-    TokenType('EQ',        r'=='),
-    TokenType('NEQ',       r'!='),
-    TokenType('GTE',       r'>='),
-    TokenType('LTE',       r'<='),
-    TokenType('GT',        r'>'),
-    TokenType('LT',        r'<'),
+    TokenType('EQ',        r'==', '='),
+    TokenType('NEQ',       r'!=', '!'),
+    TokenType('GTE',       r'>=', '>'),
+    TokenType('LTE',       r'<=', '<'),
+    TokenType('GT',        r'>', '>'),
+    TokenType('LT',        r'<', '<'),
     
     # Logical NOT operator
-    TokenType('NOT',       r'!'),
+    TokenType('NOT',       r'!', '!'),
 
     # Standard operators and delimiters
-    TokenType('ASSIGN',    r'='),
-    TokenType('PLUS',      r'\+'),
-    TokenType('MINUS',     r'-'),
-    TokenType('MUL',       r'\*'),
-    TokenType('DIV',       r'/'),
+    TokenType('ASSIGN',    r'=', '='),
+    TokenType('PLUS',      r'\+', '+'),
+    TokenType('MINUS',     r'-', '-'),
+    TokenType('MUL',       r'\*', '*'),
+    TokenType('DIV',       r'/', '/'),
     
     # Brackets for arrays
-    TokenType('LBRACKET',  r'\['),
-    TokenType('RBRACKET',  r'\]'),
-
-    TokenType('LPAREN',    r'\('),
-    TokenType('RPAREN',    r'\)'),
-    TokenType('LBRACE',    r'\{'),
-    TokenType('RBRACE',    r'\}'),
-    TokenType('SEMI',      r';'),
-    TokenType('COMMA',     r','),
+    TokenType('LBRACKET',  r'\[', '['),
+    TokenType('RBRACKET',  r'\]', ']'),
+
+    TokenType('LPAREN',    r'\(', '('),
+    TokenType('RPAREN',    r'\)', ')'),
+    TokenType('LBRACE',    r'\{', '{'),
+    TokenType('RBRACE',    r'\}', '}'),
+    TokenType('SEMI',      r';', ';'),
+    TokenType('COMMA',     r',', ','),
     
     # Any other character is a mismatch
-    TokenType('MISMATCH',  r'.'),
+    TokenType('MISMATCH',  r'.', ''),
 ]
 
+# Keywords are lexed as identifiers, then looked up here to get their real kind.
+KEYWORDS = {
+    # -- Keywords for New Features --
+    'if': TK_IF,
+    'else': TK_ELSE,
+    'while': TK_WHILE,
+    'for': TK_FOR,
+    'string': TK_STRING,
+
+    # -- Existing Keywords --
+    'bool': TK_BOOL,
+    'char': TK_CHAR,
+    'float': TK_FLOAT,
+    'int': TK_INT,
+    'def': TK_DEF,
+    'return': TK_RETURN,
+    'print': TK_PRINT,
+
+    # -- Literals --
+    'true': TK_BOOL_LIT,
+    'false': TK_BOOL_LIT,
+}
+
+# Characters that can only ever start one token, which is always one character long.
+# These are matched with a dictionary lookup instead of a regex.
+SINGLE_CHAR_TOKENS = {
+    '+': TK_PLUS, '-': TK_MINUS, '*': TK_MUL, '/': TK_DIV, # '//' is skipped as a comment before this
+    '[': TK_LBRACKET, ']': TK_RBRACKET, '(': TK_LPAREN, ')': TK_RPAREN,
+    '{': TK_LBRACE, '}': TK_RBRACE, ';': TK_SEMI, ',': TK_COMMA,
+}
+
+def build_dispatch_table():
+    """
+    For each ASCII character, the (kind, regex) pairs of the tokens that can start with it,
+    in TOKEN_SPECS order. Trying just these gives the same result as the big regex, which
+    tries every token at every position.
+    """
+    table = [() for _ in range(128)]
+    for spec in TOKEN_SPECS:
+        regex = re.compile(spec.pattern)
+        for ch in spec.first_chars:
+            table[ord(ch)] += ((TOKEN_KINDS[spec.name], regex),)
+    return table
+
+DISPATCH_TABLE = build_dispatch_table()
+
+# One big regular expression from all the small ones, used by the regex lexer for
+# characters outside ASCII, which the dispatch table doesn't cover. Compiled once here,
+# not per Lexer. Not re.ASCII: \s and \d also accept Unicode whitespace (like a pasted
+# non-breaking space) and digits, and the hand-written lexer does the same.
+TOKEN_REGEX = re.compile('|'.join(f'(?P<{spec.name}>{spec.pattern})' for spec in TOKEN_SPECS))
+
+# Operators that are one character, or two if followed by '='.
+COMPARISON_TOKENS = {
+    '=': TK_ASSIGN, '!': TK_NOT, '<': TK_LT, '>': TK_GT,
+    '==': TK_EQ, '!=': TK_NEQ, '<=': TK_LTE, '>=': TK_GTE,
+}
+
 class Lexer:
     """The lexer, responsible for turning a string into tokens."""
     def __init__(self, code):
         self.code = code
-        # We build one big regular expression from all the small ones.
-        # This is very efficient.
-        tok_regex = '|'.join(f'(?P<{spec.name}>{spec.pattern})' for spec in TOKEN_SPECS)
-        self.tok_regex = re.compile(tok_regex)
+        self.tok_regex = TOKEN_REGEX
         self.lineno = 1
         self.line_start = 0
 
     def tokenize(self):
-        """Yields tokens from the source code."""
+        """Returns the list of tokens in the source code."""
+        if USE_REGEX_LEXER:
+            return self.tokenize_regex()
+        return self.tokenize_scan()
+
+    def tokenize_scan(self):
+        """
+        The hand-written lexer: walks the source one character at a time, without `re`.
+        It accepts exactly the same tokens as the patterns in TOKEN_SPECS.
+        """
+        code = self.code
+        n = len(code)
         tokens = []
-        # finditer() finds all non-overlapping matches for our big regex.
-        for mo in self.tok_regex.finditer(self.code):
-            kind = mo.lastgroup
-            value = mo.group()
-            column = mo.start() - self.line_start
+        lineno = self.lineno
+        line_start = self.line_start
+        pos = 0
+        while pos < n:
+            ch = code[pos]
 
             # Skip whitespace and comments, but track line numbers.
-            if kind == 'WHITESPACE' or kind == 'COMMENT':
-                if '\n' in value:
-                    self.lineno += value.count('\n')
-                    self.line_start = mo.end()
+            if ch.isspace():
+                start = pos
+                pos += 1
+                while pos < n and code[pos].isspace():
+                    pos += 1
+                newlines = code.count('\n', start, pos)
+                if newlines:
+                    lineno += newlines
+                    line_start = pos
                 continue
-            
+            if ch == '/' and code.startswith('//', pos):
+                pos = code.find('\n', pos)
+                if pos == -1:
+                    pos = n
+                continue
+
+            column = pos - line_start
+            end = pos + 1
+
+            kind = SINGLE_CHAR_TOKENS.get(ch)
+            if kind is not None:
+                tokens.append(Token(kind, ch, lineno, column))
+                pos = end
+                continue
+
+            if ch in LETTERS:
+                # Identifier or keyword
+                while end < n and code[end] in IDENT_CHARS:
+                    end += 1
+                value = sys.intern(code[pos:end])
+                kind = KEYWORDS.get(value, TK_ID)
+            elif ch.isdecimal(): # Same as \d, which also accepts non-ASCII digits
+                while end < n and code[end].isdecimal():
+                    end += 1
+                kind = TK_NUMBER
+                if end + 1 < n and code[end] == '.' and code[end + 1].isdecimal():
+                    end += 2
+                    while end < n and code[end].isdecimal():
+                        end += 1
+                    kind = TK_FLOAT_LIT
+                value = code[pos:end]
+            elif ch in COMPARISON_TOKENS:
+                if end < n and code[end] == '=':
+                    end += 1
+                value = code[pos:end]
+                kind = COMPARISON_TOKENS[value]
+            elif ch == '"':
+                end = code.find('"', end)
+                if end == -1:
+                    raise RuntimeError(f'Unexpected character: {ch!r} at line {lineno}:{column}')
+                end += 1
+                value = code[pos:end]
+                kind = TK_STRING_LIT
+            elif ch == "'" and pos + 2 < n and code[pos + 1] != "'" and code[pos + 2] == "'":
+                end = pos + 3
+                value = code[pos:end]
+                kind = TK_CHAR_LIT
+            else:
+                # If we find a character that doesn't match any rule, it's an error.
+                raise RuntimeError(f'Unexpected character: {ch!r} at line {lineno}:{column}')
+
+            tokens.append(Token(kind, value, lineno, column))
+            pos = end
+
+        self.lineno = lineno
+        self.line_start = line_start
+        # Add a special "End of File" token to make parsing easier.
+        tokens.append(Token(TK_EOF, '', lineno, 0))
+        return tokens
+
+    def tokenize_regex(self):
+        """The regex-based lexer, kept as a reference for the hand-written one."""
+        code = self.code
+        tokens = []
+        pos = 0
+        while pos < len(code):
+            ch = code[pos]
+
+            # Skip whitespace and comments, but track line numbers.
+            if ch.isspace():
+                start = pos
+                pos += 1
+                while pos < len(code) and code[pos].isspace():
+                    pos += 1
+                newlines = code.count('\n', start, pos)
+                if newlines:
+                    self.lineno += newlines
+                    self.line_start = pos
+                continue
+            if ch == '/' and code.startswith('//', pos):
+                pos = code.find('\n', pos)
+                if pos == -1:
+                    pos = len(code)
+                continue
+
+            column = pos - self.line_start
+
+            # Single-character tokens need no regex at all.
+            kind = SINGLE_CHAR_TOKENS.get(ch)
+            if kind is not None:
+                tokens.append(Token(kind, ch, self.lineno, column))
+                pos += 1
+                continue
+
+            # Otherwise, try only the tokens that can start with this character.
+            if ord(ch) < 128:
+                kind = TK_MISMATCH
+                end = pos + 1
+                for candidate, regex in DISPATCH_TABLE[ord(ch)]:
+                    mo = regex.match(code, pos)
+                    if mo:
+                        kind = candidate
+                        end = mo.end()
+                        break
+            else:
+                mo = self.tok_regex.match(code, pos)
+                kind = TOKEN_KINDS[mo.lastgroup]
+                end = mo.end()
+            value = code[pos:end]
+            pos = end
+
             # If we find a character that doesn't match any rule, it's an error.
-            if kind == 'MISMATCH':
+            if kind == TK_MISMATCH:
                 raise RuntimeError(f'Unexpected character: {value!r} at line {self.lineno}:{column}')
 
+            if kind == TK_ID:
+                kind = KEYWORDS.get(value, TK_ID)
+                # Every use of a name shares one string object, so the name lookups in
+                # later passes can compare strings by identity.
+                value = sys.intern(value)
+
             tokens.append(Token(kind, value, self.lineno, column))
         
         # Add a special "End of File" token to make parsing easier.
-        tokens.append(Token('EOF', '', self.lineno, 0))
+        tokens.append(Token(TK_EOF, '', self.lineno, 0))
         return tokens
\ No newline at end of file
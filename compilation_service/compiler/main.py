@@ -1,3 +1,4 @@
+import os
 import sys
 import traceback
 import time  # <--- NEW: Import the time module
@@ -5,23 +6,57 @@ import time  # <--- NEW: Import the time module
 from lexer import Lexer
 from parser import Parser
 from semantic import SemanticAnalyzer
+from optimizer import ConstFolder
+from resolver import Resolver
 from interpreter import Interpreter
+from bytecode import BytecodeCompiler, VirtualMachine
+
+def apply_resource_limits():
+    """
+    Caps this process's memory and CPU time when the sandbox asks for it, through
+    WBM_MEMORY_LIMIT (bytes) and WBM_CPU_LIMIT (seconds). Done here, in the compiler
+    itself, because setting limits from the service between fork and exec is not safe
+    in a server process that runs threads.
+    """
+    memory_limit = os.environ.get('WBM_MEMORY_LIMIT')
+    cpu_limit = os.environ.get('WBM_CPU_LIMIT')
+    if not memory_limit and not cpu_limit:
+        return
+    import resource # Unix only, so only imported when limits are requested
+    if memory_limit:
+        resource.setrlimit(resource.RLIMIT_AS, (int(memory_limit), int(memory_limit)))
+    if cpu_limit:
+        resource.setrlimit(resource.RLIMIT_CPU, (int(cpu_limit), int(cpu_limit)))
+
+def decode_source(data):
+    """Turns the raw bytes of a source file into the text the lexer reads."""
+    # One decode of the whole file, instead of going through a text-mode stream
+    code = data.decode('utf-8')
+    # Newlines are translated the way text mode would, but only when there is a '\r' at all
+    if '\r' in code:
+        code = code.replace('\r\n', '\n').replace('\r', '\n')
+    return code
 
 def main():
+    apply_resource_limits()
+
     if len(sys.argv) != 2:
-        print("Usage: python main.py <filename>")
+        print("Usage: python main.py <filename>  (use '-' to read from stdin)")
         sys.exit(1)
 
     source_filename = sys.argv[1]
 
     try:
-        with open(source_filename, 'r') as f:
-            code = f.read()
+        if source_filename == '-':
+            code = sys.stdin.buffer.read()
+        else:
+            with open(source_filename, 'rb') as f:
+                code = f.read()
     except FileNotFoundError:
         print(f"Error: File not found at '{source_filename}'")
         sys.exit(1)
 
-
+    code = decode_source(code)
     
     try:
         # 1. Lexer
@@ -36,12 +71,26 @@ def main():
         semantic_analyzer = SemanticAnalyzer()
         semantic_analyzer.visit(ast)
 
+        # 4. Optimizer: pre-compute constant expressions
+        ast = ConstFolder().visit(ast)
+
+        # 5. Resolver: assign each variable its storage slot
+        Resolver().resolve(ast)
+
+        # WBM_ENGINE=bytecode runs the program on the bytecode VM instead of the tree-walking interpreter
+        use_bytecode = os.environ.get('WBM_ENGINE') == 'bytecode'
+        if use_bytecode:
+            program = BytecodeCompiler().compile(ast)
+
         # --- NEW: Start the timer ---
         start_time = time.time()
 
-        # 4. Interpreter
-        interpreter = Interpreter()
-        interpreter.interpret(ast)
+        # 6. Interpreter
+        if use_bytecode:
+            VirtualMachine().run(program)
+        else:
+            interpreter = Interpreter()
+            interpreter.interpret(ast)
 
         # --- NEW: Stop the timer and calculate duration ---
         end_time = time.time()
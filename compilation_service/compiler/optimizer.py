@@ -0,0 +1,127 @@
+# optimizer.py
+
+from ast_nodes import *
+from lexer import Token
+from token_kinds import *
+
+# ====================================================================================
+# This file defines the ConstFolder, an optimization pass that runs on the validated
+# AST before it is executed. It finds expressions whose operands are all literals,
+# such as `2 + 3` or `!(1 < 2)`, computes their value once, and replaces them with a
+# single literal node. The interpreter then never has to redo that math, which
+# matters most inside loops.
+# Anything that would fail at runtime, like `1 / 0`, is left alone so the error is
+# still raised (with its line number) when the program runs.
+# ====================================================================================
+
+def make_literal(value, lineno):
+    """Builds the literal node that evaluates to `value`, or returns None if there is none."""
+    if isinstance(value, bool): # Checked first: bool is a subclass of int
+        return BoolNode(Token(TK_BOOL_LIT, 'true' if value else 'false', lineno, 0))
+    if isinstance(value, int):
+        return NumNode(Token(TK_NUMBER, value, lineno, 0))
+    if isinstance(value, float):
+        return FloatNode(Token(TK_FLOAT_LIT, value, lineno, 0))
+    return None
+
+class ConstFolder:
+    """Folds constant expressions. Each visit returns the node to use in place of the one given."""
+    LITERALS = (NumNode, FloatNode, BoolNode)
+
+    def visit(self, node):
+        return self._DISPATCH.get(type(node), ConstFolder.generic_visit)(self, node)
+
+    def generic_visit(self, node):
+        raise NotImplementedError(f"No visit_{type(node).__name__} method")
+
+    # --- Statements: fold the expressions inside them ---
+
+    def visit_ProgramNode(self, node):
+        node.statements = [self.visit(statement) for statement in node.statements]
+        return node
+
+    def visit_BlockNode(self, node):
+        node.statements = [self.visit(statement) for statement in node.statements]
+        return node
+
+    def visit_VarDeclNode(self, node):
+        node.value = self.visit(node.value)
+        return node
+
+    def visit_AssignmentNode(self, node):
+        node.left = self.visit(node.left)
+        node.right = self.visit(node.right)
+        return node
+
+    def visit_PrintNode(self, node):
+        node.value = self.visit(node.value)
+        return node
+
+    def visit_IfNode(self, node):
+        node.condition = self.visit(node.condition)
+        node.then_block = self.visit(node.then_block)
+        if node.else_block:
+            node.else_block = self.visit(node.else_block)
+        return node
+
+    def visit_WhileNode(self, node):
+        node.condition = self.visit(node.condition)
+        node.body_block = self.visit(node.body_block)
+        return node
+
+    def visit_ForNode(self, node):
+        node.init = self.visit(node.init)
+        node.condition = self.visit(node.condition)
+        node.update = self.visit(node.update)
+        node.body_block = self.visit(node.body_block)
+        return node
+
+    def visit_FuncDefNode(self, node):
+        node.body = self.visit(node.body)
+        return node
+
+    def visit_ReturnNode(self, node):
+        node.value = self.visit(node.value)
+        return node
+
+    # --- Expressions: this is where the folding happens ---
+
+    def visit_BinOpNode(self, node):
+        node.left = self.visit(node.left)
+        node.right = self.visit(node.right)
+        if isinstance(node.left, self.LITERALS) and isinstance(node.right, self.LITERALS):
+            try:
+                value = node.op_fn(node.left.value, node.right.value)
+            except ZeroDivisionError:
+                return node # Leave it for the interpreter to report
+            return make_literal(value, node.op.lineno) or node
+        return node
+
+    def visit_UnaryOpNode(self, node):
+        node.expr = self.visit(node.expr)
+        if isinstance(node.expr, self.LITERALS):
+            value = node.expr.value
+            value = (not value) if node.op.type == TK_NOT else -value
+            return make_literal(value, node.op.lineno) or node
+        return node
+
+    def visit_FuncCallNode(self, node):
+        node.args = [self.visit(arg) for arg in node.args]
+        return node
+
+    def visit_ArrayLiteralNode(self, node):
+        node.elements = [self.visit(element) for element in node.elements]
+        return node
+
+    def visit_ArrayAccessNode(self, node):
+        node.index = self.visit(node.index)
+        return node
+
+    def visit_NumNode(self, node): return node
+    def visit_FloatNode(self, node): return node
+    def visit_StringNode(self, node): return node
+    def visit_CharNode(self, node): return node
+    def visit_BoolNode(self, node): return node
+    def visit_VarNode(self, node): return node
+
+ConstFolder._DISPATCH = build_dispatch(ConstFolder)
@@ -1,7 +1,10 @@
 # parser.py
 
+import operator
+
 from ast_nodes import *
 from lexer import Token
+from token_kinds import *
 
 # ====================================================================================
 # This file defines the Parser. Its job is to take the stream of tokens from the
@@ -11,23 +14,59 @@ from lexer import Token
 # ====================================================================================
 
 # A set of all keywords that represent a data type.
-TYPE_KEYWORDS = {'INT', 'FLOAT', 'BOOL', 'CHAR', 'STRING'}
+TYPE_KEYWORDS = {TK_INT, TK_FLOAT, TK_BOOL, TK_CHAR, TK_STRING}
+
+# The function that carries out each binary operator. It is looked up once while
+# parsing and stored on the BinOpNode, so the interpreter doesn't have to test
+# the operator on every evaluation. Division by zero raises ZeroDivisionError.
+BINARY_OPERATORS = {
+    TK_PLUS: operator.add,
+    TK_MINUS: operator.sub,
+    TK_MUL: operator.mul,
+    TK_DIV: operator.truediv,
+    TK_EQ: operator.eq,
+    TK_NEQ: operator.ne,
+    TK_LT: operator.lt,
+    TK_GT: operator.gt,
+    TK_LTE: operator.le,
+    TK_GTE: operator.ge,
+}
+
+# How tightly each binary operator binds; higher binds tighter.
+BINARY_PRECEDENCE = {
+    TK_EQ: 1, TK_NEQ: 1,                      # equality
+    TK_LT: 2, TK_GT: 2, TK_LTE: 2, TK_GTE: 2, # comparison
+    TK_PLUS: 3, TK_MINUS: 3,                  # term
+    TK_MUL: 4, TK_DIV: 4,                     # factor
+}
+
+# The AST node for each kind of literal token.
+LITERAL_NODES = {
+    TK_NUMBER: NumNode,
+    TK_FLOAT_LIT: FloatNode,
+    TK_STRING_LIT: StringNode,
+    TK_BOOL_LIT: BoolNode,
+    TK_CHAR_LIT: CharNode,
+}
+
+# Padding after the last token. Parsing can step at most one token past the end
+# (and peek one further) before it fails, so two are enough to never index off the list.
+END_OF_INPUT = Token(TK_EOF, '', 0, 0)
 
 class Parser:
     def __init__(self, tokens):
-        self.tokens = tokens
+        self.tokens = tokens + [END_OF_INPUT, END_OF_INPUT]
         self.pos = 0
 
     # --- Helper Methods ---
 
     def current_token(self):
         """Returns the current token without consuming it."""
-        return self.tokens[self.pos] if self.pos < len(self.tokens) else Token('EOF', '', 0, 0)
+        return self.tokens[self.pos]
 
     def peek(self, k=1):
         """Looks ahead k tokens without consuming."""
-        i = self.pos + k
-        return self.tokens[i] if i < len(self.tokens) else Token('EOF', '', 0, 0)
+        return self.tokens[self.pos + k]
 
     def advance(self):
         """Consumes the current token and moves to the next one."""
@@ -35,122 +74,120 @@ class Parser:
 
     def eat(self, token_type):
         """Consumes the current token if it matches the expected type, otherwise raises an error."""
-        token = self.current_token()
+        token = self.tokens[self.pos]
         if token.type == token_type:
-            self.advance()
+            self.pos += 1
             return token
         else:
-            raise SyntaxError(f"Expected token {token_type} but found {token.type} at line {token.lineno}")
+            raise SyntaxError(f"Expected token {TOKEN_NAMES[token_type]} but found {TOKEN_NAMES[token.type]} at line {token.lineno}")
 
     # --- Main Parsing Logic ---
 
     def parse(self):
         """Parses the entire token stream into a program AST node."""
+        tokens = self.tokens
         statements = []
-        while self.current_token().type != 'EOF':
+        while tokens[self.pos].type != TK_EOF:
             statements.append(self.parse_statement())
         return ProgramNode(statements)
 
     def parse_statement(self):
-        """Parses a single statement based on the current token."""
-        token_type = self.current_token().type
-        
-        if token_type in TYPE_KEYWORDS:
-            return self.parse_variable_declaration()
-        elif token_type == 'DEF':
-            return self.parse_function_definition()
-        elif token_type == 'PRINT':
-            return self.parse_print_statement()
-        elif token_type == 'RETURN':
-            return self.parse_return_statement()
-        elif token_type == 'IF':
-            return self.parse_if_statement()
-        elif token_type == 'WHILE':
-            return self.parse_while_statement()
-        elif token_type == 'FOR':
-            return self.parse_for_statement()
-        elif token_type == 'ID':
-            # This could be an assignment (x=10 or arr[0]=10) or a standalone function call (my_func();)
-            # We peek ahead to decide.
-            if self.peek().type == 'LPAREN': # It's a function call statement
-                expr = self.parse_expression()
-                self.eat('SEMI')
-                return expr
-            elif self.peek().type in ('ASSIGN', 'LBRACKET'): # It's an assignment
-                return self.parse_assignment_statement()
-        
-        raise SyntaxError(f"Unexpected token {token_type} at start of statement at line {self.current_token().lineno}")
+        """Parses a single statement, using the parse method for its first token."""
+        parse_method = self._STATEMENT_PARSERS.get(self.tokens[self.pos].type)
+        if parse_method is None:
+            self.raise_unexpected_statement()
+        return parse_method(self)
+
+    def raise_unexpected_statement(self):
+        token = self.tokens[self.pos]
+        raise SyntaxError(f"Unexpected token {TOKEN_NAMES[token.type]} at start of statement at line {token.lineno}")
 
     # --- Statement Parsing Methods ---
 
+    def parse_identifier_statement(self):
+        """Parses a statement that starts with a name."""
+        # This could be an assignment (x=10 or arr[0]=10) or a standalone function call (my_func();)
+        # We peek ahead to decide.
+        next_type = self.tokens[self.pos + 1].type
+        if next_type == TK_LPAREN: # It's a function call statement
+            expr = self.parse_expression()
+            self.eat(TK_SEMI)
+            return expr
+        elif next_type in (TK_ASSIGN, TK_LBRACKET): # It's an assignment
+            return self.parse_assignment_statement(next_type)
+        self.raise_unexpected_statement()
+
     def parse_variable_declaration(self):
         """Parses a variable declaration, including array types."""
         type_token = self.current_token()
         self.advance()
         
         # Check for array type, e.g., int[]
-        if self.current_token().type == 'LBRACKET':
-            self.eat('LBRACKET')
-            self.eat('RBRACKET')
+        if self.current_token().type == TK_LBRACKET:
+            self.eat(TK_LBRACKET)
+            self.eat(TK_RBRACKET)
             var_type = ArrayTypeNode(type_token.value)
         else:
             var_type = type_token.value
         
-        name_token = self.eat('ID')
-        self.eat('ASSIGN')
+        name_token = self.eat(TK_ID)
+        self.eat(TK_ASSIGN)
         value = self.parse_expression()
-        self.eat('SEMI')
+        self.eat(TK_SEMI)
         return VarDeclNode(var_type, name_token.value, value, type_token.lineno)
     
-    def parse_assignment_statement(self):
+    def parse_lvalue(self, next_type=None):
+        """Parses the left side of an assignment: a simple variable or an array access."""
+        # Callers that have already peeked pass the next token's type in
+        if next_type is None:
+            next_type = self.peek().type
+        if next_type == TK_LBRACKET:
+            return self.parse_array_access()
+        return VarNode(self.eat(TK_ID))
+
+    def parse_assignment_statement(self, next_type=None):
         """Parses an assignment to a variable or array element."""
         lineno = self.current_token().lineno
-        
-        # The left side can be a simple variable or an array access
-        if self.peek().type == 'LBRACKET':
-            left = self.parse_array_access()
-        else:
-            left = VarNode(self.eat('ID'))
-            
-        self.eat('ASSIGN')
+        left = self.parse_lvalue(next_type)
+        self.eat(TK_ASSIGN)
         right = self.parse_expression()
-        self.eat('SEMI')
+        self.eat(TK_SEMI)
         return AssignmentNode(left, right, lineno)
 
     def parse_print_statement(self):
-        lineno = self.eat('PRINT').lineno
-        self.eat('LPAREN')
+        lineno = self.eat(TK_PRINT).lineno
+        self.eat(TK_LPAREN)
         value = self.parse_expression()
-        self.eat('RPAREN')
-        self.eat('SEMI')
+        self.eat(TK_RPAREN)
+        self.eat(TK_SEMI)
         return PrintNode(value, lineno)
 
     def parse_if_statement(self):
         """Parses an if-else statement."""
-        lineno = self.eat('IF').lineno
-        self.eat('LPAREN')
+        lineno = self.eat(TK_IF).lineno
+        self.eat(TK_LPAREN)
         condition = self.parse_expression()
-        self.eat('RPAREN')
+        self.eat(TK_RPAREN)
         then_block = self.parse_block()
         else_block = None
-        if self.current_token().type == 'ELSE':
-            self.eat('ELSE')
+        if self.current_token().type == TK_ELSE:
+            self.eat(TK_ELSE)
             else_block = self.parse_block()
         return IfNode(condition, then_block, else_block, lineno)
 
     def parse_while_statement(self):
         """Parses a while loop."""
-        lineno = self.eat('WHILE').lineno
-        self.eat('LPAREN')
+        lineno = self.eat(TK_WHILE).lineno
+        self.eat(TK_LPAREN)
         condition = self.parse_expression()
-        self.eat('RPAREN')
+        self.eat(TK_RPAREN)
         body_block = self.parse_block()
         return WhileNode(condition, body_block, lineno)
 
     def parse_for_statement(self):
         """Parses a for loop: for (init; condition; update) { ... }."""
-        lineno = self.eat('FOR').lineno
-        self.eat('LPAREN')
+        lineno = self.eat(TK_FOR).lineno
+        self.eat(TK_LPAREN)
         
         # Parse initializer (can be a var declaration or assignment)
         if self.current_token().type in TYPE_KEYWORDS:
@@ -160,186 +197,173 @@ class Parser:
         
         # Parse condition
         condition = self.parse_expression()
-        self.eat('SEMI')
+        self.eat(TK_SEMI)
 
         # Parse update (is an assignment without the final semicolon)
         update_lineno = self.current_token().lineno
-        if self.peek().type == 'LBRACKET':
-            left = self.parse_array_access()
-        else:
-            left = VarNode(self.eat('ID'))
-        self.eat('ASSIGN')
+        left = self.parse_lvalue()
+        self.eat(TK_ASSIGN)
         right = self.parse_expression()
         update = AssignmentNode(left, right, update_lineno)
 
-        self.eat('RPAREN')
+        self.eat(TK_RPAREN)
         body = self.parse_block()
-        return ForNode(init, condition, update, body, lineno)
+        return ForNode(init, condition, update, body, lineno, has_decls=isinstance(init, VarDeclNode))
 
     def parse_block(self):
         """Parses a { ... } block."""
-        self.eat('LBRACE')
+        self.eat(TK_LBRACE)
+        tokens = self.tokens
         statements = []
-        while self.current_token().type != 'RBRACE' and self.current_token().type != 'EOF':
+        while tokens[self.pos].type != TK_RBRACE and tokens[self.pos].type != TK_EOF:
             statements.append(self.parse_statement())
-        self.eat('RBRACE')
-        return BlockNode(statements)
+        self.eat(TK_RBRACE)
+        # Blocks that declare nothing can share their parent's scope at runtime
+        has_decls = any(isinstance(statement, (VarDeclNode, FuncDefNode)) for statement in statements)
+        return BlockNode(statements, has_decls)
     
     def parse_return_statement(self):
-        lineno = self.eat('RETURN').lineno
+        lineno = self.eat(TK_RETURN).lineno
         value = self.parse_expression()
-        self.eat('SEMI')
+        self.eat(TK_SEMI)
         return ReturnNode(value, lineno)
 
     def parse_function_definition(self):
         """Parses a function definition."""
-        self.eat('DEF')
+        self.eat(TK_DEF)
         # ... (This function remains mostly the same, but should check TYPE_KEYWORDS)
         # For brevity, we assume it's correct from the previous version.
         return_type_token = self.current_token()
         self.advance()
-        func_name_token = self.eat('ID')
-        self.eat('LPAREN')
+        func_name_token = self.eat(TK_ID)
+        self.eat(TK_LPAREN)
         params = []
-        if self.current_token().type != 'RPAREN':
+        if self.current_token().type != TK_RPAREN:
             param_type = self.current_token().value
             self.advance()
-            param_name = self.eat('ID').value
+            param_name = self.eat(TK_ID).value
             params.append((param_type, param_name))
-            while self.current_token().type == 'COMMA':
-                self.eat('COMMA')
+            while self.current_token().type == TK_COMMA:
+                self.eat(TK_COMMA)
                 param_type = self.current_token().value
                 self.advance()
-                param_name = self.eat('ID').value
+                param_name = self.eat(TK_ID).value
                 params.append((param_type, param_name))
-        self.eat('RPAREN')
+        self.eat(TK_RPAREN)
         body = self.parse_block()
         return FuncDefNode(return_type_token.value, func_name_token.value, params, body, func_name_token.lineno)
 
     # --- Expression Parsing (with Precedence) ---
+    # Binary operators are parsed by precedence climbing, using BINARY_PRECEDENCE.
     # Lowest Precedence to Highest:
     # equality -> comparison -> term -> factor -> unary -> primary
 
-    def parse_expression(self):
-        """Entry point for parsing any expression."""
-        return self.parse_equality()
-
-    def parse_equality(self):
-        """Parses equality operators: == != """
-        node = self.parse_comparison()
-        while self.current_token().type in ('EQ', 'NEQ'):
-            op = self.current_token()
-            self.eat(op.type)
-            right = self.parse_comparison()
-            node = BinOpNode(left=node, op=op, right=right)
-        return node
-
-    def parse_comparison(self):
-        """Parses comparison operators: < > <= >="""
-        node = self.parse_term()
-        while self.current_token().type in ('LT', 'GT', 'LTE', 'GTE'):
-            op = self.current_token()
-            self.eat(op.type)
-            right = self.parse_term()
-            node = BinOpNode(left=node, op=op, right=right)
-        return node
-
-    def parse_term(self):
-        """Parses addition and subtraction: + -"""
-        node = self.parse_factor()
-        while self.current_token().type in ('PLUS', 'MINUS'):
-            op = self.current_token()
-            self.eat(op.type)
-            right = self.parse_factor()
-            node = BinOpNode(left=node, op=op, right=right)
-        return node
-
-    def parse_factor(self):
-        """Parses multiplication and division: * /"""
+    def parse_expression(self, min_precedence=1):
+        """
+        Parses an expression whose binary operators all bind at least as tightly as `min_precedence`.
+        Operators of equal precedence group to the left: a - b - c is (a - b) - c.
+        """
+        tokens = self.tokens
         node = self.parse_unary()
-        while self.current_token().type in ('MUL', 'DIV'):
-            op = self.current_token()
-            self.eat(op.type)
-            right = self.parse_unary()
-            node = BinOpNode(left=node, op=op, right=right)
+        op = tokens[self.pos]
+        precedence = BINARY_PRECEDENCE.get(op.type, 0)
+        while precedence >= min_precedence:
+            self.pos += 1
+            right = self.parse_expression(precedence + 1)
+            node = BinOpNode(left=node, op=op, right=right, op_fn=BINARY_OPERATORS[op.type])
+            op = tokens[self.pos]
+            precedence = BINARY_PRECEDENCE.get(op.type, 0)
         return node
-    
+
     def parse_unary(self):
         """Parses unary operators: ! -"""
-        token = self.current_token()
-        if token.type in ('NOT', 'MINUS'):
-            self.eat(token.type)
+        token = self.tokens[self.pos]
+        if token.type in (TK_NOT, TK_MINUS):
+            self.pos += 1
             expr = self.parse_unary()
             return UnaryOpNode(op=token, expr=expr)
         return self.parse_primary()
 
     def parse_primary(self):
         """Parses the highest-precedence expressions: literals, identifiers, calls, array access."""
-        token = self.current_token()
-        
-        if token.type == 'FLOAT_LIT':
-            self.eat('FLOAT_LIT')
-            return FloatNode(token)
-        elif token.type == 'STRING_LIT':
-            self.eat('STRING_LIT')
-            return StringNode(token)
-        elif token.type == 'BOOL_LIT':
-            self.eat('BOOL_LIT')
-            return BoolNode(token)
-        elif token.type == 'CHAR_LIT':
-            self.eat('CHAR_LIT')
-            return CharNode(token)
-        elif token.type == 'NUMBER':
-            self.eat('NUMBER')
-            return NumNode(token)
-        elif token.type == 'ID':
-            # Could be a variable, function call, or array access
-            if self.peek().type == 'LPAREN':
-                return self.parse_function_call()
-            elif self.peek().type == 'LBRACKET':
-                 return self.parse_array_access()
-            else:
-                self.eat('ID')
-                return VarNode(token)
-        elif token.type == 'LPAREN': # Grouped expression
-            self.eat('LPAREN')
-            node = self.parse_expression()
-            self.eat('RPAREN')
-            return node
-        elif token.type == 'LBRACE': # Array literal
-            return self.parse_array_literal()
-        
-        raise SyntaxError(f"Unexpected token in expression: {token.type} at line {token.lineno}")
+        parse_method = self._PRIMARY_PARSERS.get(self.tokens[self.pos].type)
+        if parse_method is None:
+            token = self.tokens[self.pos]
+            raise SyntaxError(f"Unexpected token in expression: {TOKEN_NAMES[token.type]} at line {token.lineno}")
+        return parse_method(self)
+
+    def parse_literal(self):
+        token = self.tokens[self.pos]
+        self.pos += 1
+        return LITERAL_NODES[token.type](token)
+
+    def parse_identifier(self):
+        """Parses a variable, function call, or array access."""
+        token = self.tokens[self.pos]
+        next_type = self.tokens[self.pos + 1].type
+        if next_type == TK_LPAREN:
+            return self.parse_function_call()
+        elif next_type == TK_LBRACKET:
+             return self.parse_array_access()
+        self.pos += 1
+        return VarNode(token)
+
+    def parse_grouped_expression(self):
+        """Parses an expression in parentheses."""
+        self.eat(TK_LPAREN)
+        node = self.parse_expression()
+        self.eat(TK_RPAREN)
+        return node
 
     def parse_function_call(self):
         """Parses a function call."""
-        func_name_token = self.eat('ID')
-        self.eat('LPAREN')
+        func_name_token = self.eat(TK_ID)
+        self.eat(TK_LPAREN)
         args = []
-        if self.current_token().type != 'RPAREN':
+        if self.current_token().type != TK_RPAREN:
             args.append(self.parse_expression())
-            while self.current_token().type == 'COMMA':
-                self.eat('COMMA')
+            while self.current_token().type == TK_COMMA:
+                self.eat(TK_COMMA)
                 args.append(self.parse_expression())
-        self.eat('RPAREN')
+        self.eat(TK_RPAREN)
         return FuncCallNode(func_name_token.value, args, func_name_token.lineno)
 
     def parse_array_literal(self):
         """Parses an array literal: {1, 2, 3}"""
-        lineno = self.eat('LBRACE').lineno
+        lineno = self.eat(TK_LBRACE).lineno
         elements = []
-        if self.current_token().type != 'RBRACE':
+        if self.current_token().type != TK_RBRACE:
             elements.append(self.parse_expression())
-            while self.current_token().type == 'COMMA':
-                self.eat('COMMA')
+            while self.current_token().type == TK_COMMA:
+                self.eat(TK_COMMA)
                 elements.append(self.parse_expression())
-        self.eat('RBRACE')
+        self.eat(TK_RBRACE)
         return ArrayLiteralNode(elements, lineno)
 
     def parse_array_access(self):
         """Parses an array access: my_array[i]"""
-        name_token = self.eat('ID')
-        self.eat('LBRACKET')
+        name_token = self.eat(TK_ID)
+        self.eat(TK_LBRACKET)
         index_expr = self.parse_expression()
-        self.eat('RBRACKET')
-        return ArrayAccessNode(name_token.value, index_expr, name_token.lineno)
\ No newline at end of file
+        self.eat(TK_RBRACKET)
+        return ArrayAccessNode(name_token.value, index_expr, name_token.lineno)
+
+# The parse method for each token that can start a statement, and for each token
+# that can start a primary expression. One dict lookup replaces a chain of comparisons.
+Parser._STATEMENT_PARSERS = {
+    **{type_kind: Parser.parse_variable_declaration for type_kind in TYPE_KEYWORDS},
+    TK_DEF: Parser.parse_function_definition,
+    TK_PRINT: Parser.parse_print_statement,
+    TK_RETURN: Parser.parse_return_statement,
+    TK_IF: Parser.parse_if_statement,
+    TK_WHILE: Parser.parse_while_statement,
+    TK_FOR: Parser.parse_for_statement,
+    TK_ID: Parser.parse_identifier_statement,
+}
+
+Parser._PRIMARY_PARSERS = {
+    **{literal_kind: Parser.parse_literal for literal_kind in LITERAL_NODES},
+    TK_ID: Parser.parse_identifier,
+    TK_LPAREN: Parser.parse_grouped_expression,
+    TK_LBRACE: Parser.parse_array_literal,
+}
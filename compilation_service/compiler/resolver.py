@@ -0,0 +1,178 @@
+# resolver.py
+
+from ast_nodes import *
+
+# ====================================================================================
+# This file defines the Resolver. It runs once over the validated AST, before the
+# interpreter, and works out where every variable and function will live at runtime.
+# Each scope gets a numbered list of "slots", and every name in the program is
+# tagged with:
+# - depth: how many scopes to walk up from the current one.
+# - slot:  the position of the name inside that scope.
+# This lets the interpreter read a variable with a list index instead of searching
+# dictionaries by name.
+#
+# The scopes here mirror the ones the interpreter creates, which are not always the
+# same as the ones the semantic analyzer checks: a function call only sees its own
+# scope and the global scope, wherever the function was defined.
+# ====================================================================================
+
+class Scope:
+    """A scope as seen by the resolver: maps names to slot numbers."""
+    def __init__(self, parent=None):
+        self.parent = parent
+        # Functions and variables are looked up separately, but share one list of slots.
+        self.variables = {}
+        self.functions = {}
+        self.size = 0
+
+    def declare(self, table, name):
+        slot = table.get(name)
+        if slot is None:
+            slot = table[name] = self.size
+            self.size += 1
+        return slot
+
+    def declare_variable(self, name):
+        return self.declare(self.variables, name)
+
+    def declare_function(self, name):
+        return self.declare(self.functions, name)
+
+    def lookup(self, table_name, name):
+        """Returns (depth, slot) for the name, or (None, None) if it is not visible."""
+        scope = self
+        depth = 0
+        while scope is not None:
+            slot = getattr(scope, table_name).get(name)
+            if slot is not None:
+                return depth, slot
+            scope = scope.parent
+            depth += 1
+        return None, None
+
+class Resolver:
+    """The resolver, responsible for assigning a (depth, slot) to every name."""
+    def __init__(self):
+        self.global_scope = None
+        self.scope = None
+
+    def visit(self, node):
+        return self._DISPATCH.get(type(node), Resolver.generic_visit)(self, node)
+
+    def generic_visit(self, node):
+        raise NotImplementedError(f"No visit_{type(node).__name__} method")
+
+    def resolve(self, ast):
+        self.visit(ast)
+        return ast
+
+    def open_scope(self, parent):
+        self.scope = Scope(parent=parent)
+        return self.scope
+
+    # --- Visitor Methods ---
+
+    def visit_ProgramNode(self, node):
+        self.global_scope = self.open_scope(None)
+        for statement in node.statements:
+            self.visit(statement)
+        node.scope_size = self.global_scope.size
+
+    def visit_BlockNode(self, node):
+        # A block without declarations gets no scope, matching the interpreter
+        if not node.has_decls:
+            for statement in node.statements:
+                self.visit(statement)
+            return
+        outer = self.scope
+        scope = self.open_scope(outer)
+        for statement in node.statements:
+            self.visit(statement)
+        node.scope_size = scope.size
+        self.scope = outer
+
+    def visit_VarDeclNode(self, node):
+        # The value is resolved first, so `int x = x + 1;` reads an outer x
+        self.visit(node.value)
+        node.slot = self.scope.declare_variable(node.var_name)
+
+    def visit_AssignmentNode(self, node):
+        self.visit(node.right)
+        self.visit(node.left)
+
+    def visit_IfNode(self, node):
+        self.visit(node.condition)
+        self.visit(node.then_block)
+        if node.else_block:
+            self.visit(node.else_block)
+
+    def visit_WhileNode(self, node):
+        self.visit(node.condition)
+        self.visit(node.body_block)
+
+    def visit_ForNode(self, node):
+        outer = self.scope
+        if node.has_decls:
+            self.open_scope(outer)
+        self.visit(node.init)
+        self.visit(node.condition)
+        self.visit(node.update)
+        self.visit(node.body_block)
+        node.scope_size = self.scope.size if node.has_decls else 0
+        self.scope = outer
+
+    def visit_PrintNode(self, node):
+        self.visit(node.value)
+
+    def visit_FuncDefNode(self, node):
+        # Declared before the body is resolved, so the function can call itself
+        node.slot = self.scope.declare_function(node.func_name)
+
+        # At runtime a call's scope hangs off the global scope, not the defining one
+        outer = self.scope
+        scope = self.open_scope(self.global_scope)
+        node.param_slots = tuple(scope.declare_variable(param_name) for _, param_name in node.params)
+        node.arity = len(node.param_slots)
+
+        # The body's declarations go in the same frame as the parameters,
+        # so a call only needs one scope instead of two
+        for statement in node.body.statements:
+            self.visit(statement)
+        node.body.has_decls = False
+        node.frame_size = scope.size
+        self.scope = outer
+
+    def visit_ReturnNode(self, node):
+        self.visit(node.value)
+
+    def visit_BinOpNode(self, node):
+        self.visit(node.left)
+        self.visit(node.right)
+
+    def visit_UnaryOpNode(self, node):
+        self.visit(node.expr)
+
+    def visit_FuncCallNode(self, node):
+        for arg in node.args:
+            self.visit(arg)
+        node.depth, node.slot = self.scope.lookup('functions', node.func_name)
+
+    def visit_ArrayLiteralNode(self, node):
+        for element in node.elements:
+            self.visit(element)
+
+    def visit_ArrayAccessNode(self, node):
+        self.visit(node.index)
+        node.depth, node.slot = self.scope.lookup('variables', node.name)
+
+    def visit_VarNode(self, node):
+        node.depth, node.slot = self.scope.lookup('variables', node.value)
+
+    def visit_NumNode(self, node): pass
+    def visit_FloatNode(self, node): pass
+    def visit_StringNode(self, node): pass
+    def visit_CharNode(self, node): pass
+    def visit_BoolNode(self, node): pass
+
+Resolver._DISPATCH = build_dispatch(Resolver)
@@ -1,6 +1,7 @@
 # semantic.py
 
 from ast_nodes import *
+from token_kinds import *
 
 # ====================================================================================
 # This file defines the Semantic Analyzer. Its job is to walk the AST produced by
@@ -18,6 +19,7 @@ class Symbol:
     def __init__(self, name, type):
         self.name = name
         self.type = type
+        self.is_array = type.__class__ is ArrayType # Saves an isinstance check on every array access
 
 class FunctionSymbol(Symbol):
     """Represents a function symbol."""
@@ -32,16 +34,26 @@ class VariableSymbol(Symbol):
         super().__init__(name, type)
 
 class ArrayType:
-    """A custom class to represent array types, e.g., 'array of int'."""
+    """
+    A custom class to represent array types, e.g., 'array of int'.
+    Create these with array_type(), never directly: there is only one ArrayType per
+    base type, so two array types are equal exactly when they are the same object.
+    """
     def __init__(self, base_type):
         self.base_type = base_type
     
-    def __eq__(self, other):
-        return isinstance(other, ArrayType) and self.base_type == other.base_type
-    
     def __repr__(self):
         return f"array({self.base_type})"
 
+_ARRAY_TYPES = {}
+
+def array_type(base_type):
+    """Returns the one ArrayType for the given base type."""
+    result = _ARRAY_TYPES.get(base_type)
+    if result is None:
+        result = _ARRAY_TYPES[base_type] = ArrayType(base_type)
+    return result
+
 class SymbolTable:
     """A table to store symbols for a given scope."""
     def __init__(self, parent=None):
@@ -49,16 +61,18 @@ class SymbolTable:
         self.parent = parent
 
     def define(self, symbol):
-        if self.symbols.get(symbol.name):
-            return False # Symbol already exists
-        self.symbols[symbol.name] = symbol
-        return True
+        """Adds the symbol to this scope. Returns False if the name is already taken here."""
+        return self.symbols.setdefault(symbol.name, symbol) is symbol
 
     def resolve(self, name):
-        symbol = self.symbols.get(name)
-        if symbol is None and self.parent:
-            return self.parent.resolve(name)
-        return symbol
+        """Finds the symbol in this scope or the nearest enclosing one; None if there is none."""
+        scope = self
+        while scope is not None:
+            symbol = scope.symbols.get(name)
+            if symbol is not None:
+                return symbol
+            scope = scope.parent
+        return None
 
 class SemanticAnalyzer:
     """The semantic analyzer, responsible for all static analysis."""
@@ -67,9 +81,8 @@ class SemanticAnalyzer:
         self.current_function = None
 
     def visit(self, node):
-        method_name = f'visit_{type(node).__name__}'
-        visitor = getattr(self, method_name, self.generic_visit)
-        return visitor(node)
+        # _DISPATCH maps each node class to its visitor (built below the class)
+        return self._DISPATCH.get(type(node), SemanticAnalyzer.generic_visit)(self, node)
 
     def generic_visit(self, node):
         raise NotImplementedError(f"No visit_{type(node).__name__} method")
@@ -96,18 +109,20 @@ class SemanticAnalyzer:
     
     def visit_VarDeclNode(self, node):
         init_type = self.visit(node.value)
-        var_type = node.var_type.base_type if isinstance(node.var_type, ArrayTypeNode) else node.var_type
 
         # Handle array types
-        if isinstance(node.var_type, ArrayTypeNode):
-            if not isinstance(init_type, ArrayType):
+        if node.is_array:
+            var_type = node.var_type.base_type
+            if init_type.__class__ is not ArrayType:
                 raise TypeError(f"Type mismatch: cannot assign {init_type} to array type at line {node.lineno}")
             if init_type.base_type != 'any' and init_type.base_type != var_type:
                  raise TypeError(f"Type mismatch: cannot assign array of {init_type.base_type} to array of {var_type} at line {node.lineno}")
-            var_type = ArrayType(var_type)
+            var_type = array_type(var_type)
         # Handle primitive types
-        elif init_type != var_type:
-            raise TypeError(f"Type mismatch: cannot assign {init_type} to '{node.var_name}' of type {var_type} at line {node.lineno}")
+        else:
+            var_type = node.var_type
+            if init_type != var_type:
+                raise TypeError(f"Type mismatch: cannot assign {init_type} to '{node.var_name}' of type {var_type} at line {node.lineno}")
         
         if not self.current_scope.define(VariableSymbol(node.var_name, var_type)):
             raise NameError(f"Variable '{node.var_name}' already declared in this scope at line {node.lineno}")
@@ -173,34 +188,34 @@ class SemanticAnalyzer:
         right_type = self.visit(node.right)
         op = node.op.type
 
-        if op in ('PLUS', 'MINUS', 'MUL', 'DIV'):
+        if op in (TK_PLUS, TK_MINUS, TK_MUL, TK_DIV):
             # Allow math on int and float
             if left_type not in ('int', 'float') or right_type not in ('int', 'float'):
                 raise TypeError(f"Unsupported operand types for arithmetic: '{left_type}' and '{right_type}'")
             return 'float' if 'float' in (left_type, right_type) else 'int'
         
-        if op in ('LT', 'GT', 'LTE', 'GTE'):
+        if op in (TK_LT, TK_GT, TK_LTE, TK_GTE):
             # Allow comparison on int and float
             if left_type not in ('int', 'float') or right_type not in ('int', 'float'):
                 raise TypeError(f"Unsupported operand types for comparison: '{left_type}' and '{right_type}'")
             return 'bool'
         
-        if op in ('EQ', 'NEQ'):
+        if op in (TK_EQ, TK_NEQ):
             # Allow equality checks on most types, as long as they match
             if left_type != right_type:
                 raise TypeError(f"Cannot compare {left_type} and {right_type} for equality")
             return 'bool'
         
-        raise TypeError(f"Unknown binary operator {op}")
+        raise TypeError(f"Unknown binary operator {TOKEN_NAMES[op]}")
 
     def visit_UnaryOpNode(self, node):
         expr_type = self.visit(node.expr)
         op = node.op.type
-        if op == 'NOT' and expr_type == 'bool':
+        if op == TK_NOT and expr_type == 'bool':
             return 'bool'
-        if op == 'MINUS' and expr_type in ('int', 'float'):
+        if op == TK_MINUS and expr_type in ('int', 'float'):
             return expr_type
-        raise TypeError(f"Unsupported unary operator '{op}' for type {expr_type}")
+        raise TypeError(f"Unsupported unary operator '{TOKEN_NAMES[op]}' for type {expr_type}")
     
     def visit_FuncCallNode(self, node):
         # ... (Same as previous version) ...
@@ -212,21 +227,21 @@ class SemanticAnalyzer:
 
     def visit_ArrayLiteralNode(self, node):
         if not node.elements:
-            return ArrayType('any') # Empty array
+            return array_type('any') # Empty array
         
         # Check that all elements have the same type
         first_type = self.visit(node.elements[0])
         for element in node.elements[1:]:
             if self.visit(element) != first_type:
                 raise TypeError(f"Array elements must all be of the same type at line {node.lineno}")
-        return ArrayType(first_type)
+        return array_type(first_type)
 
     def visit_ArrayAccessNode(self, node):
         array_symbol = self.current_scope.resolve(node.name)
         if not array_symbol:
             raise NameError(f"Array '{node.name}' is not defined at line {node.lineno}")
         
-        if not isinstance(array_symbol.type, ArrayType):
+        if not array_symbol.is_array:
             raise TypeError(f"'{node.name}' is not an array and cannot be indexed at line {node.lineno}")
         
         index_type = self.visit(node.index)
@@ -244,4 +259,6 @@ class SemanticAnalyzer:
         symbol = self.current_scope.resolve(node.value)
         if not symbol:
             raise NameError(f"Variable '{node.value}' is not defined at line {node.lineno}")
-        return symbol.type
\ No newline at end of file
+        return symbol.type
+
+SemanticAnalyzer._DISPATCH = build_dispatch(SemanticAnalyzer)
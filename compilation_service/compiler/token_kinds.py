@@ -0,0 +1,45 @@
+# token_kinds.py
+
+# ====================================================================================
+# This file defines the kinds of tokens the lexer produces. Each kind is a small
+# integer, which is quicker to compare than a string; the parser and the later passes
+# check token kinds constantly. TOKEN_NAMES maps a kind back to its name, so error
+# messages can still say things like "Expected token SEMI".
+# ====================================================================================
+
+TOKEN_NAMES = (
+    'EOF',
+
+    # -- Literals and Identifiers --
+    'ID', 'NUMBER', 'FLOAT_LIT', 'STRING_LIT', 'CHAR_LIT', 'BOOL_LIT',
+
+    # -- Keywords --
+    'IF', 'ELSE', 'WHILE', 'FOR', 'STRING',
+    'BOOL', 'CHAR', 'FLOAT', 'INT', 'DEF', 'RETURN', 'PRINT',
+
+    # -- Operators and Delimiters --
+    'EQ', 'NEQ', 'GTE', 'LTE', 'GT', 'LT', 'NOT',
+    'ASSIGN', 'PLUS', 'MINUS', 'MUL', 'DIV',
+    'LBRACKET', 'RBRACKET', 'LPAREN', 'RPAREN', 'LBRACE', 'RBRACE', 'SEMI', 'COMMA',
+
+    # -- Only used inside the lexer --
+    'COMMENT', 'WHITESPACE', 'MISMATCH',
+)
+
+(
+    TK_EOF,
+
+    TK_ID, TK_NUMBER, TK_FLOAT_LIT, TK_STRING_LIT, TK_CHAR_LIT, TK_BOOL_LIT,
+
+    TK_IF, TK_ELSE, TK_WHILE, TK_FOR, TK_STRING,
+    TK_BOOL, TK_CHAR, TK_FLOAT, TK_INT, TK_DEF, TK_RETURN, TK_PRINT,
+
+    TK_EQ, TK_NEQ, TK_GTE, TK_LTE, TK_GT, TK_LT, TK_NOT,
+    TK_ASSIGN, TK_PLUS, TK_MINUS, TK_MUL, TK_DIV,
+    TK_LBRACKET, TK_RBRACKET, TK_LPAREN, TK_RPAREN, TK_LBRACE, TK_RBRACE, TK_SEMI, TK_COMMA,
+
+    TK_COMMENT, TK_WHITESPACE, TK_MISMATCH,
+) = range(len(TOKEN_NAMES))
+
+# The kind for each name, e.g. TOKEN_KINDS['SEMI'] == TK_SEMI
+TOKEN_KINDS = {name: kind for kind, name in enumerate(TOKEN_NAMES)}
@@ -0,0 +1,124 @@
+import contextlib
+import io
+import os
+import sys
+import unittest
+
+COMPILER_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "compiler")
+sys.path.insert(0, COMPILER_DIR)
+
+from lexer import Lexer
+from parser import Parser
+from semantic import SemanticAnalyzer
+from optimizer import ConstFolder
+from resolver import Resolver
+from interpreter import Interpreter
+from bytecode import BytecodeCompiler, VirtualMachine
+
+# Small programs for what the sample files don't cover: functions, scopes and runtime errors
+PROGRAMS = {
+    "recursion": """
+        def int fib(int n) {
+            if (n < 2) { return n; }
+            return fib(n - 1) + fib(n - 2);
+        }
+        for (int i = 0; i < 10; i = i + 1) { print(fib(i)); }
+    """,
+    "scopes": """
+        int x = 1;
+        def int get() { return x; }
+        if (true) {
+            int x = 2;
+            print(x);
+            print(get());
+        }
+        x = 3;
+        print(get());
+    """,
+    "arrays_and_floats": """
+        float[] values = {1.5, 2.5, 3.0};
+        float total = 0.0;
+        int i = 0;
+        while (i < 3) { total = total + values[i]; i = i + 1; }
+        print(total);
+        print(7 / 2);
+        print(!(1 < 2));
+        print(-values[0]);
+    """,
+    "too_few_arguments": """
+        def int two(int a, int b) { return a; }
+        print(two(1));
+    """,
+    "too_many_arguments": """
+        def int one(int a) { return a; }
+        def int noisy() { print("evaluated"); return 2; }
+        print(one(1, noisy()));
+    """,
+    "missing_argument_read": """
+        def int two(int a, int b) { print(b); return a; }
+        print("before");
+        print(two(1));
+    """,
+    "division_by_zero": """
+        int zero = 0;
+        print("before");
+        print(1 / zero);
+    """,
+    "index_out_of_bounds": """
+        int[] a = {1, 2};
+        a[2] = 3;
+    """,
+}
+
+def run(source, use_bytecode):
+    """Runs a program on one engine. Returns its output and the error it raised, if any."""
+    ast = Parser(Lexer(source).tokenize()).parse()
+    SemanticAnalyzer().visit(ast)
+    ast = Resolver().resolve(ConstFolder().visit(ast))
+    output = io.StringIO()
+    error = None
+    with contextlib.redirect_stdout(output):
+        try:
+            if use_bytecode:
+                VirtualMachine().run(BytecodeCompiler().compile(ast))
+            else:
+                Interpreter().interpret(ast)
+        except Exception as e:
+            error = (type(e).__name__, str(e))
+    return output.getvalue(), error
+
+class EnginesAgreeTest(unittest.TestCase):
+    """The bytecode VM must behave exactly like the tree-walking interpreter."""
+
+    def assert_engines_agree(self, source):
+        expected = run(source, use_bytecode=False)
+        self.assertEqual(run(source, use_bytecode=True), expected)
+        return expected
+
+    def test_sample_programs(self):
+        for name in ("test.lang", "test_web.lang"):
+            with self.subTest(name):
+                with open(os.path.join(COMPILER_DIR, name)) as f:
+                    output, error = self.assert_engines_agree(f.read())
+                self.assertIsNone(error)
+                self.assertTrue(output)
+
+    def test_programs(self):
+        for name, source in PROGRAMS.items():
+            with self.subTest(name):
+                self.assert_engines_agree(source)
+
+    def test_wrong_argument_count(self):
+        # Argument counts are not checked: a missing argument is only an error when
+        # its parameter is read, and extra arguments are evaluated, then dropped.
+        expected = {
+            "too_few_arguments": ("1\n", None),
+            "too_many_arguments": ("evaluated\n1\n", None),
+            "missing_argument_read": ("before\n", ("NameError", "Variable 'b' not found.")),
+        }
+        for name, result in expected.items():
+            with self.subTest(name):
+                self.assertEqual(self.assert_engines_agree(PROGRAMS[name]), result)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import os
+import sys
+import unittest
+
+COMPILER_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "compiler")
+sys.path.insert(0, COMPILER_DIR)
+
+from lexer import Lexer
+
+# Inputs where the two lexers could most easily drift apart
+EDGE_CASES = {
+    "unicode_digit": "int x = \u0663;", # ARABIC-INDIC DIGIT THREE
+    "non_breaking_space": "int\u00a0x = 1;",
+    "floats": "float f = 1.5 + 20.25 * 3;",
+    "float_without_fraction": "1.",
+    "comparisons": "a != b <= c >= d == e < f > g = !h",
+    "char_literal": "char c = 'a';",
+    "empty_char_literal": "''",
+    "unterminated_string": 'string s = "abc',
+    "multi_line_string": 'string s = "a\nb";\nprint(s);',
+    "comment_at_eof": "int x = 1; // no newline after this",
+    "keyword_touching_digit": "1if if1",
+    "blank_lines": "x\n\n  \n   y\t;",
+}
+
+def lex(source, method):
+    """Runs one of the lexer's methods. Returns the token stream, or the error it raised."""
+    try:
+        tokens = getattr(Lexer(source), method)()
+    except Exception as e:
+        return (type(e).__name__, str(e))
+    return [(token.type, token.value, token.lineno, token.column) for token in tokens]
+
+class LexersAgreeTest(unittest.TestCase):
+    """The hand-written lexer must produce exactly what the regex lexer does."""
+
+    def assert_lexers_agree(self, source):
+        self.assertEqual(lex(source, "tokenize_scan"), lex(source, "tokenize_regex"))
+
+    def test_sample_programs(self):
+        for name in ("test.lang", "test_web.lang"):
+            with self.subTest(name):
+                with open(os.path.join(COMPILER_DIR, name)) as f:
+                    self.assert_lexers_agree(f.read())
+
+    def test_edge_cases(self):
+        for name, source in EDGE_CASES.items():
+            with self.subTest(name):
+                self.assert_lexers_agree(source)
+
+    def test_errors_are_reported(self):
+        for name in ("float_without_fraction", "empty_char_literal", "unterminated_string"):
+            with self.subTest(name):
+                result = lex(EDGE_CASES[name], "tokenize_scan")
+                self.assertEqual(result[0], "RuntimeError")
+
+if __name__ == "__main__":
+    unittest.main()